@@ -23,8 +23,56 @@ import re
 from datetime import datetime
 from pathlib import Path
 import shutil
+import tempfile
 import threading
 import queue
+import codecs
+import select
+
+try:
+    import orjson
+except ImportError:  # optional; fall back to the stdlib encoder
+    orjson = None
+
+# Directory holding this script and extract_and_align_classifier.py
+_SCRIPT_DIR = Path(__file__).parent
+
+# Log markers _monitor_logs reacts to, matched with a single search per line.
+# The marker group (lastgroup) closes last; the nested groups capture its fields.
+_LOG_MARKER_RE = re.compile(
+    r"(?P<eof>End of file.*stopping playback)"
+    r"|(?P<accept>(?i:✅ action accepted:)(?: (?P<accepted_action>.+))?)"
+    r"|(?P<reject>(?i:❌ action rejected:)(?: (?P<rejected_action>.+))?)"
+    r"|(?P<claude>🎭 Claude response:"
+    r"(?: (?P<claude_action>[^(]+) \((?P<claude_confidence>[\d.]+)% confidence, (?P<claude_duration>[\d.]+)s\))?)"
+)
+
+# Field extraction for the structured acceptance/rejection blocks in the log
+_INLINE_ACCEPT_RE = re.compile(r'([^(]+)\s*\(([\d.]+)%\s*≥\s*([\d.]+)%\)')
+_INLINE_REJECT_RE = re.compile(r'([^(]+)\s*\(([\d.]+)%\s*<\s*([\d.]+)%\)')
+_CONFIDENCE_RE = re.compile(r'Confidence: ([\d.]+)%')
+_CONFIDENCE_DETAIL_RE = re.compile(r'Confidence: ([\d.]+)% \((?:≥ ([\d.]+)% required|< ([\d.]+)%)\)')
+_TIME_RE = re.compile(r'Time: (\d{2}:\d{2}:\d{2})')
+
+# Console prefix for a completed acceptance/rejection block, keyed by is_accepted
+_VERDICT_PREFIX = {True: "✅ Action ACCEPTED: ", False: "❌ Action REJECTED: "}
+
+# Summary lines printed by extract_and_align_classifier.py -> (metrics key, parser)
+_SUMMARY_METRICS = {
+    'Total detections': ('total_detections', int),
+    'Accepted detections': ('accepted_detections', int),
+    'Rejected detections': ('rejected_detections', int),
+    'Average confidence': ('avg_confidence', float),
+    'Average similarity': ('avg_similarity', float),
+    'Average analysis time': ('avg_analysis_time', float),
+}
+_SUMMARY_METRIC_RE = re.compile(r"(" + "|".join(_SUMMARY_METRICS) + r"):\s*(\d+(?:\.\d+)?)")
+
+def _json_bytes(obj):
+    """Serialize obj as indented JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
 
 class EvaluationPipeline:
     def __init__(self, viam_config_path, output_dir="evaluation_results", timeout_minutes=10):
@@ -34,16 +82,29 @@ class EvaluationPipeline:
         self.timeout_minutes = timeout_minutes
         
         # Create unique subdirectory for this evaluation run
-        self.run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.output_dir = self.base_output_dir / f"run_{self.run_timestamp}"
+        started = datetime.now()
+        self.run_timestamp = started.strftime("%Y%m%d_%H%M%S")
+        # Run directory relative to base_output_dir, used for paths recorded in the results
+        self.run_dir = Path(f"run_{self.run_timestamp}")
+        self.output_dir = self.base_output_dir / self.run_dir
         self.output_dir.mkdir(exist_ok=True)
         
         self.current_process = None
-        self.log_queue = queue.Queue()
+        # Set by the log thread when the end-of-file marker shows up or stdout closes,
+        # and by the exit watcher when viam-server exits
+        self.log_event = threading.Event()
+        self.eof_seen = False
+        # Set by the log thread each time a chunk of output arrives
+        self.output_event = threading.Event()
+        # Console output from the log thread goes through here (see _print_worker)
+        self.print_queue = queue.Queue(maxsize=1024)
+        print_thread = threading.Thread(target=self._print_worker)
+        print_thread.daemon = True
+        print_thread.start()
         
         # Results tracking
         self.results = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': started.isoformat(),
             'run_id': self.run_timestamp,
             'output_directory': str(self.output_dir),
             'timeout_minutes': timeout_minutes,
@@ -72,10 +133,13 @@ class EvaluationPipeline:
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1
+                bufsize=0,
+                start_new_session=True  # own process group, so teardown reaches its children
             )
             
+            self.log_event.clear()
+            self.eof_seen = False
+            
             # Start log monitoring in separate thread
             log_thread = threading.Thread(
                 target=self._monitor_logs,
@@ -84,48 +148,48 @@ class EvaluationPipeline:
             log_thread.daemon = True
             log_thread.start()
             
+            # stdout can outlive viam-server (a child still holding the pipe), so watch the exit too
+            exit_thread = threading.Thread(
+                target=self._watch_exit,
+                args=(self.current_process,)
+            )
+            exit_thread.daemon = True
+            exit_thread.start()
+            
             # Wait for completion or timeout
-            start_time = time.time()
             timeout_seconds = timeout_minutes * 60
             video_finished = False
             
             print(f"📺 Monitoring logs for end-of-file signal...")
             print(f"📝 Logs being written to: {log_file}")
             
-            while True:
-                # Check if process is still running
-                if self.current_process.poll() is not None:
-                    print("🔴 Viam-server process ended")
-                    break
-                
-                # Check for timeout
-                elapsed = time.time() - start_time
-                if elapsed > timeout_seconds:
-                    print(f"⏰ Timeout reached ({timeout_minutes} minutes)")
-                    break
-                
-                # Check log queue for end-of-file signal
-                try:
-                    log_line = self.log_queue.get_nowait()
-                    if "End of file" in log_line and "stopping playback" in log_line:
-                        print("🎬 Video playback completed!")
-                        video_finished = True
-                        time.sleep(2)  # Give a moment for final logs
-                        break
-                except queue.Empty:
-                    pass
-                
-                time.sleep(0.5)
+            # Sleep until the log thread or the exit watcher signals, or the timeout passes
+            signalled = self.log_event.wait(timeout=timeout_seconds)
+            if signalled and not self.eof_seen and self.current_process.poll() is not None:
+                # viam-server exited; the end-of-file marker may still be in the pipe, so stop
+                # anything it left holding the pipe and let the log thread read to the end
+                self._signal_server(signal.SIGTERM)
+                log_thread.join(timeout=5)
+            
+            if not signalled:
+                print(f"⏰ Timeout reached ({timeout_minutes} minutes)")
+            elif self.eof_seen:
+                print("🎬 Video playback completed!")
+                video_finished = True
+                self._wait_for_quiet_output()  # Give a moment for final logs
+            else:
+                print("🔴 Viam-server process ended")
             
             # Cleanup
             if self.current_process and self.current_process.poll() is None:
-                print("🛑 Stopping viam-server...")
-                self.current_process.terminate()
-                try:
-                    self.current_process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    self.current_process.kill()
-                    self.current_process.wait()
+                self._stop_server()
+            else:
+                # viam-server is gone; stop anything it left running that still holds the pipe
+                self._signal_server(signal.SIGTERM)
+            
+            # Let the log thread drain the pipe and close (flush) the log file
+            log_thread.join(timeout=5)
+            self._drain_print_queue(timeout=5)
             
             print(f"✅ Log capture complete: {log_file}")
             return log_file, video_finished
@@ -133,9 +197,62 @@ class EvaluationPipeline:
         except Exception as e:
             print(f"❌ Error running viam-server: {e}")
             if self.current_process:
-                self.current_process.kill()
+                self._signal_server(signal.SIGKILL)
             return None, False
     
+    def _watch_exit(self, process):
+        """Wake run_viam_server as soon as viam-server exits."""
+        process.wait()
+        self.log_event.set()
+    
+    def _wait_for_quiet_output(self, idle=0.2, limit=2):
+        """Wait until viam-server output has been idle for `idle` seconds, at most `limit` seconds."""
+        deadline = time.monotonic() + limit
+        while time.monotonic() < deadline:
+            self.output_event.clear()
+            if not self.output_event.wait(timeout=idle):
+                break
+    
+    def _stop_server(self):
+        """Ask viam-server to shut down, killing it if it has not exited within 5 seconds."""
+        print("🛑 Stopping viam-server...")
+        self._signal_server(signal.SIGTERM)
+        if not self._wait_for_exit(timeout=5):
+            self._signal_server(signal.SIGKILL)
+            self.current_process.wait()
+    
+    def _signal_server(self, sig):
+        """Send sig to viam-server's process group (viam-server and anything it spawned)."""
+        try:
+            os.killpg(self.current_process.pid, sig)
+        except ProcessLookupError:
+            pass
+    
+    def _wait_for_exit(self, timeout):
+        """Wait up to timeout seconds for viam-server to exit; return True if it did."""
+        process = self.current_process
+        if hasattr(os, 'pidfd_open'):
+            # Linux: the pidfd becomes readable when the process exits, so no poll loop
+            try:
+                pidfd = os.pidfd_open(process.pid)
+            except OSError:
+                pidfd = None
+            if pidfd is not None:
+                try:
+                    ready, _, _ = select.select([pidfd], [], [], timeout)
+                finally:
+                    os.close(pidfd)
+                if ready:
+                    # Exited; reap it here, or wait for _watch_exit to finish reaping it
+                    process.wait()
+                return bool(ready)
+        
+        try:
+            process.wait(timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+    
     def _monitor_logs(self, stdout, log_file):
         """Monitor stdout and write to log file while watching for end-of-file signal."""
         try:
@@ -145,25 +262,35 @@ class EvaluationPipeline:
             current_time = None
             is_accepted = None
             
-            with open(log_file, 'w') as f:
-                for line in stdout:
-                    f.write(line)
-                    f.flush()
+            # Block-buffered; _read_lines flushes about once a second rather than per line
+            with open(log_file, 'w', buffering=65536) as f:
+                for line in self._read_lines(stdout, f):
+                    # Every marker contains one of these; most lines match none and skip the regex
+                    event = None
+                    if "✅" in line or "❌" in line or "🎭" in line or "End of file" in line:
+                        marker = _LOG_MARKER_RE.search(line)
+                        if marker:
+                            event = marker.lastgroup
                     
                     # Check for end-of-file signal
-                    if "End of file" in line and "stopping playback" in line:
-                        self.log_queue.put(line)
+                    if event == 'eof':
+                        f.flush()  # the run is about to wind down; get the log onto disk now
+                        self.eof_seen = True
+                        self.log_event.set()
+                    
+                    # Plain line outside an acceptance/rejection block: nothing to parse
+                    if event is None and not current_action:
+                        continue
                     
                     # Handle new structured acceptance/rejection format
-                    if re.search(r'✅ action accepted:', line, re.IGNORECASE) or re.search(r'✅ ACTION ACCEPTED:', line):
-                        # Extract action name from acceptance message
-                        accept_match = re.search(r'✅ (?:action accepted|ACTION ACCEPTED): ([^\n]+)', line, re.IGNORECASE)
-                        if accept_match:
-                            current_action = accept_match.group(1).strip()
+                    if event == 'accept':
+                        # Action name captured by the marker regex
+                        if marker['accepted_action']:
+                            current_action = marker['accepted_action'].strip()
                             is_accepted = True
                             
                             # Check for inline confidence format (e.g., "Stir (85.0% ≥ 75.0%)")
-                            inline_confidence_match = re.search(r'([^(]+)\s*\(([\d.]+)%\s*≥\s*([\d.]+)%\)', current_action)
+                            inline_confidence_match = _INLINE_ACCEPT_RE.search(current_action)
                             if inline_confidence_match:
                                 action_name = inline_confidence_match.group(1).strip()
                                 confidence = float(inline_confidence_match.group(2))
@@ -171,15 +298,14 @@ class EvaluationPipeline:
                                 current_action = action_name
                                 current_confidence = f"{confidence:.1f}"
                                 current_time = "00:00:00"  # Will be updated if found in subsequent lines
-                    elif re.search(r'❌ action rejected:', line, re.IGNORECASE) or re.search(r'❌ Action rejected:', line):
-                        # Extract action name from rejection message
-                        reject_match = re.search(r'❌ (?:action rejected|Action rejected): ([^\n]+)', line, re.IGNORECASE)
-                        if reject_match:
-                            current_action = reject_match.group(1).strip()
+                    elif event == 'reject':
+                        # Action name captured by the marker regex
+                        if marker['rejected_action']:
+                            current_action = marker['rejected_action'].strip()
                             is_accepted = False
                             
                             # Check for inline confidence format (e.g., "Stir (68.0% < 75.0%)")
-                            inline_confidence_match = re.search(r'([^(]+)\s*\(([\d.]+)%\s*<\s*([\d.]+)%\)', current_action)
+                            inline_confidence_match = _INLINE_REJECT_RE.search(current_action)
                             if inline_confidence_match:
                                 action_name = inline_confidence_match.group(1).strip()
                                 confidence = float(inline_confidence_match.group(2))
@@ -187,35 +313,23 @@ class EvaluationPipeline:
                                 current_action = action_name
                                 current_confidence = f"{confidence:.1f}"
                                 current_time = "00:00:00"  # Will be updated if found in subsequent lines
-                    elif current_action and re.search(r'Confidence: ([\d.]+)%', line):
+                    elif current_action and "Confidence:" in line and _CONFIDENCE_RE.search(line):
                         # Extract confidence value - handle both formats
-                        confidence_match = re.search(r'Confidence: ([\d.]+)% \(≥ ([\d.]+)% required\)', line)
-                        if not confidence_match:
-                            confidence_match = re.search(r'Confidence: ([\d.]+)% \(< ([\d.]+)%\)', line)
+                        confidence_match = _CONFIDENCE_DETAIL_RE.search(line)
                         if confidence_match:
                             current_confidence = confidence_match.group(1)
-                    elif current_action and re.search(r'Time: (\d{2}:\d{2}:\d{2})', line):
+                    elif current_action and "Time:" in line and (time_match := _TIME_RE.search(line)):
                         # Extract time value
-                        time_match = re.search(r'Time: (\d{2}:\d{2}:\d{2})', line)
-                        if time_match:
-                            current_time = time_match.group(1)
+                        current_time = time_match.group(1)
                     elif current_action and "==========================================" in line:
                         # End of structured message - print complete info
-                        if is_accepted:
-                            status = "ACCEPTED"
-                            emoji = "✅"
-                        else:
-                            status = "REJECTED"
-                            emoji = "❌"
-                        
-                        # Print with all available information
-                        info_parts = [current_action]
+                        message = _VERDICT_PREFIX[is_accepted] + current_action
                         if current_confidence:
-                            info_parts.append(f"{current_confidence}% confidence")
+                            message += f" | {current_confidence}% confidence"
                         if current_time:
-                            info_parts.append(f"at {current_time}")
+                            message += f" | at {current_time}"
                         
-                        print(f"{emoji} Action {status}: {' | '.join(info_parts)}")
+                        self._emit(message)
                         
                         # Reset state
                         current_action = None
@@ -224,71 +338,142 @@ class EvaluationPipeline:
                         is_accepted = None
                     
                     # Also handle other important signals
-                    elif "🎭 Claude response:" in line:
+                    elif event == 'claude':
                         # Extract and print Claude response in a readable format
-                        claude_match = re.search(r'🎭 Claude response: ([^(]+) \(([\d.]+)% confidence, ([\d.]+)s\)', line)
-                        if claude_match:
-                            action = claude_match.group(1).strip()
-                            confidence = claude_match.group(2)
-                            duration = claude_match.group(3)
-                            print(f"🎭 Claude: {action} ({confidence}% confidence, {duration}s)")
+                        if marker['claude_action']:
+                            action = marker['claude_action'].strip()
+                            confidence = marker['claude_confidence']
+                            duration = marker['claude_duration']
+                            self._emit(f"🎭 Claude: {action} ({confidence}% confidence, {duration}s)")
         except Exception as e:
             print(f"❌ Log monitoring error: {e}")
+        finally:
+            # Wake up run_viam_server as soon as the output stream closes
+            self.log_event.set()
+    
+    def _read_lines(self, stdout, f):
+        """Yield lines from the raw stdout pipe, copying each chunk to f as it arrives."""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        fd = stdout.fileno()
+        pending = ""
+        last_flush = time.monotonic()
+        
+        try:
+            while True:
+                # Wake at least once a second so a server that has gone quiet still gets its log flushed
+                ready, _, _ = select.select([fd], [], [], 1)
+                if ready:
+                    # One read syscall per 64 KB chunk rather than one per line
+                    chunk = os.read(fd, 65536)
+                    self.output_event.set()
+                    text = decoder.decode(chunk, final=not chunk)
+                    f.write(text)
+                # A line-buffered server hands us a line per read; flush on a timer instead
+                now = time.monotonic()
+                if now - last_flush > 1:
+                    f.flush()
+                    last_flush = now
+                if not ready:
+                    continue
+                pending += text
+                if not chunk:
+                    break
+                *lines, pending = pending.split('\n')
+                yield from lines
+            
+            # Output that did not end with a newline
+            if pending:
+                yield pending
+        finally:
+            # Stream ended or the caller bailed out: write out whatever is still buffered
+            if not f.closed:
+                f.flush()
+    
+    def _emit(self, message):
+        """Queue a console message from the log thread; drop it if the printer is backed up."""
+        try:
+            self.print_queue.put_nowait(message)
+        except queue.Full:
+            pass
+    
+    def _print_worker(self):
+        """Print queued messages so a slow terminal never blocks log draining."""
+        while True:
+            message = self.print_queue.get()
+            try:
+                print(message)
+            except Exception:
+                pass  # closed terminal/pipe or unencodable text: keep draining
+            finally:
+                self.print_queue.task_done()
+    
+    def _drain_print_queue(self, timeout):
+        """Wait up to timeout seconds for queued console messages to be printed."""
+        with self.print_queue.all_tasks_done:
+            self.print_queue.all_tasks_done.wait_for(
+                lambda: not self.print_queue.unfinished_tasks, timeout=timeout)
     
     def run_analysis(self, log_file, video_name):
         """Run the classification analysis on the captured logs."""
         print(f"\n🔍 Running analysis for: {video_name}")
         
         try:
-            # Change to evaluation directory to run the analysis script
-            original_cwd = os.getcwd()
-            script_dir = Path(__file__).parent
-            os.chdir(script_dir)
-            
-            # Run the extraction and analysis script
+            # Run the extraction and analysis script from the evaluation directory,
+            # streaming its stdout straight into the run-specific analysis file
+            script_dir = _SCRIPT_DIR
+            analysis_file = self.output_dir / f"analysis_{self.run_timestamp}.txt"
             cmd = ["python3", "extract_and_align_classifier.py", str(log_file)]
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            
-            # Return to original directory
-            os.chdir(original_cwd)
+            with open(analysis_file, 'w+') as f, tempfile.TemporaryFile('w+') as err:
+                f.write(
+                    f"Analysis for: {video_name}\n"
+                    f"Run ID: {self.run_timestamp}\n"
+                    f"Timestamp: {datetime.now().isoformat()}\n"
+                    + "=" * 60 + "\n\n"
+                )
+                f.flush()
+                output_start = f.tell()
+                # Both streams go to files, so no pipe-draining threads are needed
+                process = subprocess.Popen(cmd, stdout=f, stderr=err, cwd=script_dir)
+                try:
+                    returncode = process.wait(timeout=60)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+                    raise
+                
+                # Read back just the script output for metric extraction; it is a few KB, and
+                # scanning it while it streams would need a pipe and a reader loop again
+                f.seek(output_start)
+                analysis_output = f.read()
+                err.seek(0)
+                stderr = err.read()
+                if stderr:
+                    f.write("\n" + "=" * 60 + "\n" + "STDERR:\n" + stderr)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 print("✅ Analysis completed successfully")
                 
-                # Save analysis output in run-specific directory
-                analysis_file = self.output_dir / f"analysis_{self.run_timestamp}.txt"
-                with open(analysis_file, 'w') as f:
-                    f.write(f"Analysis for: {video_name}\n")
-                    f.write(f"Run ID: {self.run_timestamp}\n")
-                    f.write(f"Timestamp: {datetime.now().isoformat()}\n")
-                    f.write("=" * 60 + "\n\n")
-                    f.write(result.stdout)
-                    if result.stderr:
-                        f.write("\n" + "=" * 60 + "\n")
-                        f.write("STDERR:\n")
-                        f.write(result.stderr)
-                
                 # Also check if timeline log was generated and move it to run directory
                 timeline_pattern = f"*{self.run_timestamp}*timeline.log"
                 for timeline_file in script_dir.glob(timeline_pattern):
                     dest_file = self.output_dir / timeline_file.name
-                    shutil.move(str(timeline_file), str(dest_file))
+                    try:
+                        timeline_file.replace(dest_file)
+                    except OSError:  # --output-dir on another filesystem
+                        shutil.move(str(timeline_file), str(dest_file))
                     print(f"📄 Timeline log moved to: {dest_file}")
                 
                 print(f"📄 Analysis saved to: {analysis_file}")
-                return analysis_file, result.stdout
+                return analysis_file, analysis_output
             else:
-                print(f"❌ Analysis failed (exit code: {result.returncode})")
-                print(f"Error: {result.stderr}")
+                print(f"❌ Analysis failed (exit code: {returncode})")
+                print(f"Error: {stderr}")
+                analysis_file.unlink(missing_ok=True)  # only a successful analysis leaves a file
                 return None, None
                 
         except subprocess.TimeoutExpired:
             print("❌ Analysis timed out")
+            analysis_file.unlink(missing_ok=True)
             return None, None
         except Exception as e:
             print(f"❌ Analysis error: {e}")
@@ -299,32 +484,11 @@ class EvaluationPipeline:
         if not analysis_output:
             return {}
         
+        # Later occurrences (e.g. the insights section) override earlier ones
         metrics = {}
-        lines = analysis_output.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if "Total detections:" in line:
-                metrics['total_detections'] = int(line.split(':')[-1].strip())
-            elif "Accepted detections:" in line:
-                metrics['accepted_detections'] = int(line.split(':')[-1].strip())
-            elif "Rejected detections:" in line:
-                metrics['rejected_detections'] = int(line.split(':')[-1].strip())
-            elif "Average confidence:" in line:
-                try:
-                    metrics['avg_confidence'] = float(line.split(':')[-1].strip().replace('%', ''))
-                except:
-                    pass
-            elif "Average similarity:" in line:
-                try:
-                    metrics['avg_similarity'] = float(line.split(':')[-1].strip().replace('%', ''))
-                except:
-                    pass
-            elif "Average analysis time:" in line:
-                try:
-                    metrics['avg_analysis_time'] = float(line.split(':')[-1].strip().replace('s', ''))
-                except:
-                    pass
+        for match in _SUMMARY_METRIC_RE.finditer(analysis_output):
+            key, parse = _SUMMARY_METRICS[match.group(1)]
+            metrics[key] = parse(match.group(2))
         
         return metrics
     
@@ -341,50 +505,54 @@ class EvaluationPipeline:
         
         # Create a README file in the run directory
         readme_file = self.output_dir / "README.md"
-        with open(readme_file, 'w') as f:
-            f.write(f"# Evaluation Run: {self.run_timestamp}\n\n")
-            f.write(f"**Timestamp:** {datetime.now().isoformat()}\n")
-            f.write(f"**Timeout:** {self.timeout_minutes} minutes\n")
-            f.write(f"**Viam Config:** {self.viam_config_path}\n\n")
-            f.write("## Files in this directory:\n")
-            f.write("- `viam_server_*.log` - Raw server logs\n")
-            f.write("- `analysis_*.txt` - Classification analysis results\n")
-            f.write("- `*_timeline.log` - Processed detection timeline\n")
-            f.write("- `evaluation_results_*.json` - Complete evaluation metrics\n")
-            f.write("- `README.md` - This file\n")
+        readme_file.write_text(
+            f"# Evaluation Run: {self.run_timestamp}\n\n"
+            f"**Timestamp:** {self.results['timestamp']}\n"
+            f"**Timeout:** {self.timeout_minutes} minutes\n"
+            f"**Viam Config:** {self.viam_config_path}\n\n"
+            "## Files in this directory:\n"
+            "- `viam_server_*.log` - Raw server logs\n"
+            "- `analysis_*.txt` - Classification analysis results\n"
+            "- `*_timeline.log` - Processed detection timeline\n"
+            "- `evaluation_results_*.json` - Complete evaluation metrics\n"
+            "- `README.md` - This file\n"
+        )
         
-        # Step 1: Run viam-server and capture logs (use instance timeout)
-        log_file, video_finished = self.run_viam_server()
-        
-        if log_file:
-            video_result = {
-                'log_file': str(log_file.relative_to(self.base_output_dir)),
-                'video_completed': video_finished,
-                'timestamp': datetime.now().isoformat(),
-                'success': False,
-                'metrics': {}
-            }
-            
-            # Step 2: Run analysis
-            analysis_file, analysis_output = self.run_analysis(log_file, "current_session")
+        try:
+            # Step 1: Run viam-server and capture logs (use instance timeout)
+            log_file, video_finished = self.run_viam_server()
             
-            if analysis_file:
-                video_result['analysis_file'] = str(analysis_file.relative_to(self.base_output_dir))
-                video_result['metrics'] = self.extract_summary_metrics(analysis_output)
-                video_result['success'] = True
+            if log_file:
+                video_result = {
+                    'log_file': str(self.run_dir / log_file.name),
+                    'video_completed': video_finished,
+                    'timestamp': datetime.now().isoformat(),
+                    'success': False,
+                    'metrics': {}
+                }
+                # Record the session up front so a failed analysis still leaves it in the results
+                self.results['session'] = video_result
                 
-                print(f"✅ Successfully processed session")
+                # Step 2: Run analysis
+                analysis_file, analysis_output = self.run_analysis(log_file, "current_session")
                 
-                # Generate summary
-                self.generate_summary([video_result['metrics']])
-                self.results['session'] = video_result
+                if analysis_file:
+                    video_result['analysis_file'] = str(self.run_dir / analysis_file.name)
+                    video_result['metrics'] = self.extract_summary_metrics(analysis_output)
+                    video_result['success'] = True
+                    
+                    print(f"✅ Successfully processed session")
+                    
+                    # Generate summary
+                    self.generate_summary([video_result['metrics']])
+                else:
+                    print(f"❌ Analysis failed")
             else:
-                print(f"❌ Analysis failed")
-                self.results['session'] = video_result
-        else:
-            print(f"❌ Log capture failed")
+                print(f"❌ Log capture failed")
+        finally:
+            # Persist whatever was collected, even if a later stage raised or was interrupted
+            self.save_results()
         
-        self.save_results()
         print(f"\n🎉 Evaluation Pipeline Complete!")
         print(f"📊 Results saved to: {self.output_dir}")
         print(f"🔗 Run directory: {self.output_dir}")
@@ -414,12 +582,10 @@ class EvaluationPipeline:
             summary['acceptance_rate'] = 0
         
         # Add other metrics
-        if metrics.get('avg_confidence'):
-            summary['avg_confidence'] = metrics['avg_confidence']
-        if metrics.get('avg_similarity'):
-            summary['avg_similarity'] = metrics['avg_similarity']
-        if metrics.get('avg_analysis_time'):
-            summary['avg_analysis_time'] = metrics['avg_analysis_time']
+        for key in ('avg_confidence', 'avg_similarity', 'avg_analysis_time'):
+            value = metrics.get(key)
+            if value:
+                summary[key] = value
         
         self.results['summary'] = summary
         
@@ -440,39 +606,57 @@ class EvaluationPipeline:
         """Save complete results to JSON file in run-specific directory."""
         results_file = self.output_dir / f"evaluation_results_{self.run_timestamp}.json"
         
-        with open(results_file, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        results_file.write_bytes(_json_bytes(self.results))
         
         print(f"💾 Complete results saved to: {results_file}")
         
         # Also create a summary file for quick reference
         summary_file = self.output_dir / f"summary_{self.run_timestamp}.txt"
-        with open(summary_file, 'w') as f:
-            f.write(f"Evaluation Run Summary: {self.run_timestamp}\n")
-            f.write("=" * 50 + "\n\n")
-            f.write(f"Timestamp: {self.results['timestamp']}\n")
-            f.write(f"Run ID: {self.run_timestamp}\n\n")
-            
-            if 'summary' in self.results:
-                summary = self.results['summary']
-                f.write("Performance Metrics:\n")
-                f.write(f"- Total detections: {summary.get('total_detections', 0)}\n")
-                f.write(f"- Accepted: {summary.get('accepted_detections', 0)}\n")
-                f.write(f"- Rejected: {summary.get('rejected_detections', 0)}\n")
-                if summary.get('acceptance_rate'):
-                    f.write(f"- Acceptance rate: {summary['acceptance_rate']:.1f}%\n")
-                if summary.get('avg_confidence'):
-                    f.write(f"- Average confidence: {summary['avg_confidence']:.1f}%\n")
-                if summary.get('avg_similarity'):
-                    f.write(f"- Average similarity: {summary['avg_similarity']:.1f}%\n")
-                if summary.get('avg_analysis_time'):
-                    f.write(f"- Average analysis time: {summary['avg_analysis_time']:.1f}s\n")
+        lines = [
+            f"Evaluation Run Summary: {self.run_timestamp}",
+            "=" * 50,
+            "",
+            f"Timestamp: {self.results['timestamp']}",
+            f"Run ID: {self.run_timestamp}",
+            "",
+        ]
+        
+        if 'summary' in self.results:
+            summary = self.results['summary']
+            lines += [
+                "Performance Metrics:",
+                f"- Total detections: {summary.get('total_detections', 0)}",
+                f"- Accepted: {summary.get('accepted_detections', 0)}",
+                f"- Rejected: {summary.get('rejected_detections', 0)}",
+            ]
+            if summary.get('acceptance_rate'):
+                lines.append(f"- Acceptance rate: {summary['acceptance_rate']:.1f}%")
+            if summary.get('avg_confidence'):
+                lines.append(f"- Average confidence: {summary['avg_confidence']:.1f}%")
+            if summary.get('avg_similarity'):
+                lines.append(f"- Average similarity: {summary['avg_similarity']:.1f}%")
+            if summary.get('avg_analysis_time'):
+                lines.append(f"- Average analysis time: {summary['avg_analysis_time']:.1f}s")
+        
+        summary_file.write_text("\n".join(lines) + "\n")
         
         print(f"📋 Quick summary saved to: {summary_file}")
     
     def cleanup(self):
-        """Restore original configuration."""
-        pass
+        """Stop viam-server if it is still running (e.g. after Ctrl-C)."""
+        # viam-server runs in its own session, so a terminal SIGINT never reaches it
+        if self.current_process and self.current_process.poll() is None:
+            self._stop_server()
+
+class _Terminated(BaseException):
+    """Raised in the main thread on SIGTERM/SIGHUP; a BaseException so it unwinds like Ctrl-C."""
+    def __init__(self, signum):
+        super().__init__(signal.Signals(signum).name)
+        self.signum = signum
+
+def _raise_terminated(signum, frame):
+    """Turn SIGTERM/SIGHUP into _Terminated so main() still runs cleanup()."""
+    raise _Terminated(signum)
 
 def main():
     parser = argparse.ArgumentParser(description="Automated Viam Action Classifier Evaluation")
@@ -498,6 +682,10 @@ def main():
     print(f"   Timeout: {args.timeout} minutes")
     print()
     
+    # viam-server has its own session and won't see these; unwind through cleanup() instead
+    signal.signal(signal.SIGTERM, _raise_terminated)
+    signal.signal(signal.SIGHUP, _raise_terminated)
+    
     # Create and run pipeline with custom timeout
     pipeline = EvaluationPipeline(args.config, args.output_dir, args.timeout)
     
@@ -505,6 +693,8 @@ def main():
         pipeline.run_evaluation()
     except KeyboardInterrupt:
         print(f"\n⚠️  Interrupted by user")
+    except _Terminated as e:
+        print(f"\n⚠️  Stopped by {e}")
     except Exception as e:
         print(f"❌ Pipeline error: {e}")
     finally:
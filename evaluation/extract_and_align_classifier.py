@@ -9,32 +9,85 @@ Usage:
 If no log file is provided, you can paste the terminal output when prompted.
 """
 
+import numpy as np
 import pandas as pd
 import re
 import sys
-from datetime import datetime
 from collections import defaultdict, Counter
+from functools import lru_cache
+from itertools import islice
+
+# Acceptance/rejection format: "✅ ACTION ACCEPTED: <action>" followed by Confidence/Time lines
+_ACCEPT_MARKER_RE = re.compile(r'✅ action accepted:', re.IGNORECASE)
+_ACCEPT_RE = re.compile(r'✅ action accepted: ([^\n]+)', re.IGNORECASE)
+_REJECT_MARKER_RE = re.compile(r'❌ action rejected:', re.IGNORECASE)
+_REJECT_RE = re.compile(r'❌ action rejected: ([^\n]+)', re.IGNORECASE)
+_INLINE_ACCEPT_RE = re.compile(r'([^(]+)\s*\(([\d.]+)%\s*≥\s*([\d.]+)%\)')
+_INLINE_REJECT_RE = re.compile(r'([^(]+)\s*\(([\d.]+)%\s*<\s*([\d.]+)%(?:,\s*(\d{2}:\d{2}:\d{2}))?\)')
+_EMBEDDED_TIMESTAMP_RE = re.compile(r'([^(]+)\s*\(([\d.]+)%\s*<\s*([\d.]+)%,\s*(\d{2}:\d{2}:\d{2})\)')
+_CONFIDENCE_ACCEPT_RE = re.compile(r'Confidence: ([\d.]+)% \(≥ ([\d.]+)% required\)')
+_CONFIDENCE_REJECT_RE = re.compile(r'Confidence: ([\d.]+)% \(< ([\d.]+)%\)')
+_TIME_RE = re.compile(r'Time: (\d{2}:\d{2}:\d{2})')
+_CLOCK_RE = re.compile(r'(\d{2}:\d{2}:\d{2})')
+
+# Motion detection format: "🎬 ===== MOTION DETECTED ===== 🎬" block plus Claude response block
+_SIMILARITY_RE = re.compile(r'📊 Similarity: ([\d.]+)%')
+_MOTION_TIME_RE = re.compile(r'⏰ Time: (\d{2}:\d{2}:\d{2}).*?Duration: ([\d.]+)s')
+_DETECTED_ACTION_RE = re.compile(r'🎭 Detected Action: ([^{"\s]+(?:\s+[^{"\s]+)*)')
+_DETECTED_CONFIDENCE_RE = re.compile(r'🎯 Confidence: ([\d.]+)%')
+_ANALYSIS_DURATION_RE = re.compile(r'⏱️  Analysis Duration: ([\d.]+)s')
+# First verdict within the 5 lines after a motion block's closing line (matched from the line start)
+_MOTION_VERDICT_RE = re.compile(
+    r'(?:[^\n]*\n){0,4}?[^\n]*?(?P<verdict>✅ Action ACCEPTED:|❌ Action REJECTED:|❌ No action detected)'
+)
+
+# Any line that can start one of the detection formats above (branches re-check the line)
+_DETECTION_START_RE = re.compile(
+    r'✅ action accepted:|❌ action rejected:|🎬 ===== MOTION DETECTED ===== 🎬', re.IGNORECASE
+)
+
+_FOOD_RE = re.compile(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z).*Food detected and added to cache: (.+?) \(confidence: ([\d.]+)\)')
+
+def _lines_from(text, start):
+    """Yield (line, offset of the next line) for each line of text from offset start, like split('\\n')."""
+    end = len(text)
+    while start <= end:
+        newline = text.find('\n', start)
+        if newline == -1:
+            newline = end
+        yield text[start:newline], newline + 1
+        start = newline + 1
+
+def _section_end_line(text, start, sentinel, markers):
+    """Offset of the line holding the next sentinel after start, or None if a marker shows up before it (or there is no sentinel)."""
+    end = text.find(sentinel, start)
+    if end == -1 or any(text.find(marker, start, end) != -1 for marker in markers):
+        return None
+    return text.rfind('\n', 0, end) + 1
 
 def extract_classifier_detections(log_text):
     """Extract classifier action detections from terminal log text."""
     detections = []
     
-    # New pattern to match the structured log format
-    lines = log_text.split('\n')
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i]
+    # Jump straight to lines that can start a detection instead of testing every line;
+    # lines are sliced out of log_text on demand rather than splitting the whole log
+    resume = 0  # offset of the first line not consumed by an earlier detection
+    for anchor in _DETECTION_START_RE.finditer(log_text):
+        if anchor.start() < resume:
+            continue
+        line_start = log_text.rfind('\n', 0, anchor.start()) + 1
+        rest = _lines_from(log_text, line_start)
+        line, resume = next(rest)
         
         # Look for acceptance messages in the new format (they come before action detection)
-        if re.search(r'✅ action accepted:', line, re.IGNORECASE) or re.search(r'✅ ACTION ACCEPTED:', line):
+        if _ACCEPT_MARKER_RE.search(line):
             # Extract action from acceptance message
-            accept_match = re.search(r'✅ (?:action accepted|ACTION ACCEPTED): ([^\n]+)', line, re.IGNORECASE)
+            accept_match = _ACCEPT_RE.search(line)
             if accept_match:
                 action = accept_match.group(1).strip()
                 
                 # Check if confidence is embedded in the same line (e.g., "Stir (85.0% ≥ 75.0%)")
-                inline_confidence_match = re.search(r'([^(]+)\s*\(([\d.]+)%\s*≥\s*([\d.]+)%\)', action)
+                inline_confidence_match = _INLINE_ACCEPT_RE.search(action)
                 if inline_confidence_match:
                     # Extract action name and confidence from the inline format
                     action_name = inline_confidence_match.group(1).strip()
@@ -52,7 +105,7 @@ def extract_classifier_detections(log_text):
                         'analysis_duration': None,
                         'similarity': None,
                         'accepted': True,
-                        'raw_lines': [line]
+                        'raw_spans': [(line_start, resume - 1)]  # (start, end) offsets of the block's lines in log_text
                     }
                 else:
                     # Initialize detection data without inline confidence
@@ -65,19 +118,19 @@ def extract_classifier_detections(log_text):
                         'analysis_duration': None,
                         'similarity': None,
                         'accepted': True,
-                        'raw_lines': [line]
+                        'raw_spans': [(line_start, resume - 1)]  # (start, end) offsets of the block's lines in log_text
                     }
                 
                 # Look for the confidence and time lines in the next few lines (only if not found inline)
                 if detection['confidence'] is None:
-                    for j in range(i + 1, min(i + 10, len(lines))):
-                        next_line = lines[j]
-                        detection['raw_lines'].append(next_line)
+                    block_end = resume - 1
+                    for next_line, after in islice(rest, 9):
+                        block_end = after - 1
                         
                         # Look for confidence line - handle both acceptance and rejection formats
-                        confidence_match = re.search(r'Confidence: ([\d.]+)% \(≥ ([\d.]+)% required\)', next_line)
+                        confidence_match = _CONFIDENCE_ACCEPT_RE.search(next_line)
                         if not confidence_match:
-                            confidence_match = re.search(r'Confidence: ([\d.]+)% \(< ([\d.]+)%\)', next_line)
+                            confidence_match = _CONFIDENCE_REJECT_RE.search(next_line)
                         if confidence_match:
                             detected_confidence = float(confidence_match.group(1))
                             threshold = float(confidence_match.group(2))
@@ -85,13 +138,14 @@ def extract_classifier_detections(log_text):
                             detection['threshold'] = threshold
                         
                         # Look for time line
-                        time_match = re.search(r'Time: (\d{2}:\d{2}:\d{2})', next_line)
+                        time_match = _TIME_RE.search(next_line)
                         if time_match:
                             detection['timestamp'] = time_match.group(1)
                         
                         # Stop if we hit the separator line (end of this log entry)
                         if "==========================================" in next_line:
                             break
+                    detection['raw_spans'] = [(line_start, block_end)]
                 
                 # Only add detection if we found the essential components and it's not "(none)"
                 if (detection['action'] and 
@@ -100,7 +154,7 @@ def extract_classifier_detections(log_text):
                     # If no timestamp found, use a default or try to extract from the line
                     if detection['timestamp'] == "00:00:00":
                         # Try to extract timestamp from the log line itself
-                        timestamp_match = re.search(r'(\d{2}:\d{2}:\d{2})', line)
+                        timestamp_match = _CLOCK_RE.search(line)
                         if timestamp_match:
                             detection['timestamp'] = timestamp_match.group(1)
                     
@@ -108,14 +162,14 @@ def extract_classifier_detections(log_text):
                     detections.append(detection)
         
         # Also look for rejection messages
-        elif re.search(r'❌ action rejected:', line, re.IGNORECASE) or re.search(r'❌ Action rejected:', line):
+        elif _REJECT_MARKER_RE.search(line):
             # Extract action from rejection message
-            reject_match = re.search(r'❌ (?:action rejected|Action rejected): ([^\n]+)', line, re.IGNORECASE)
+            reject_match = _REJECT_RE.search(line)
             if reject_match:
                 action = reject_match.group(1).strip()
                 
                 # Check if confidence is embedded in the same line (e.g., "Stir (68.0% < 75.0%)" or "Season (75.0% < 85.0%, 17:29:18)")
-                inline_confidence_match = re.search(r'([^(]+)\s*\(([\d.]+)%\s*<\s*([\d.]+)%(?:,\s*(\d{2}:\d{2}:\d{2}))?\)', action)
+                inline_confidence_match = _INLINE_REJECT_RE.search(action)
                 if inline_confidence_match:
                     # Extract action name and confidence from the inline format
                     action_name = inline_confidence_match.group(1).strip()
@@ -134,7 +188,7 @@ def extract_classifier_detections(log_text):
                         'analysis_duration': None,
                         'similarity': None,
                         'accepted': False,
-                        'raw_lines': [line]
+                        'raw_spans': [(line_start, resume - 1)]  # (start, end) offsets of the block's lines in log_text
                     }
                 else:
                     # Initialize detection data without inline confidence
@@ -147,17 +201,17 @@ def extract_classifier_detections(log_text):
                         'analysis_duration': None,
                         'similarity': None,
                         'accepted': False,
-                        'raw_lines': [line]
+                        'raw_spans': [(line_start, resume - 1)]  # (start, end) offsets of the block's lines in log_text
                     }
                 
                 # Look for the confidence and time lines in the next few lines (only if not found inline)
                 if detection['confidence'] is None:
-                    for j in range(i + 1, min(i + 10, len(lines))):
-                        next_line = lines[j]
-                        detection['raw_lines'].append(next_line)
+                    block_end = resume - 1
+                    for next_line, after in islice(rest, 9):
+                        block_end = after - 1
                         
                         # Look for confidence line (rejection format might be different)
-                        confidence_match = re.search(r'Confidence: ([\d.]+)% \(< ([\d.]+)%\)', next_line)
+                        confidence_match = _CONFIDENCE_REJECT_RE.search(next_line)
                         if confidence_match:
                             detected_confidence = float(confidence_match.group(1))
                             threshold = float(confidence_match.group(2))
@@ -165,13 +219,14 @@ def extract_classifier_detections(log_text):
                             detection['threshold'] = threshold
                         
                         # Look for time line
-                        time_match = re.search(r'Time: (\d{2}:\d{2}:\d{2})', next_line)
+                        time_match = _TIME_RE.search(next_line)
                         if time_match:
                             detection['timestamp'] = time_match.group(1)
                         
                         # Stop if we hit the separator line (end of this log entry)
                         if "==========================================" in next_line:
                             break
+                    detection['raw_spans'] = [(line_start, block_end)]
                 
                 # Only add detection if we found the essential components and it's not "(none)"
                 if (detection['action'] and 
@@ -180,14 +235,14 @@ def extract_classifier_detections(log_text):
                     # If no timestamp found, try to extract from the log line itself
                     if detection['timestamp'] == "00:00:00":
                         # Try to extract timestamp from the log line itself
-                        timestamp_match = re.search(r'(\d{2}:\d{2}:\d{2})', line)
+                        timestamp_match = _CLOCK_RE.search(line)
                         if timestamp_match:
                             detection['timestamp'] = timestamp_match.group(1)
                     
                     # For rejected actions, also check if timestamp is embedded in the action string
-                    if detection['timestamp'] == "00:00:00" and not detection.get('accepted', True):
+                    if detection['timestamp'] == "00:00:00" and not detection['accepted']:
                         # Look for timestamp at the end of the action string (e.g., "Season (75.0% < 85.0%, 17:29:18)")
-                        embedded_timestamp_match = re.search(r'([^(]+)\s*\(([\d.]+)%\s*<\s*([\d.]+)%,\s*(\d{2}:\d{2}:\d{2})\)', detection['action'])
+                        embedded_timestamp_match = _EMBEDDED_TIMESTAMP_RE.search(detection['action'])
                         if embedded_timestamp_match:
                             action_name = embedded_timestamp_match.group(1).strip()
                             detection['action'] = action_name
@@ -208,74 +263,85 @@ def extract_classifier_detections(log_text):
                 'analysis_duration': None,
                 'similarity': None,
                 'accepted': False,
-                'raw_lines': []
+                'raw_spans': []  # (start, end) offsets of the block's lines in log_text
             }
             
-            # Capture all lines in this detection block
-            block_start = i
+            # Walk the lines of this detection block, starting with the MOTION DETECTED line.
+            # Once a section's fields are all filled, the rest of it is skipped unless a field repeats.
+            block_line = line
+            skip_checked = False
             
             # Parse the motion detected section
-            while i < len(lines) and not "📋 ===== CLAUDE RESPONSE ===== 📋" in lines[i]:
-                detection['raw_lines'].append(lines[i])
-                
+            while block_line is not None and not "📋 ===== CLAUDE RESPONSE ===== 📋" in block_line:
                 # Extract similarity and threshold
-                if "📊 Similarity:" in lines[i]:
-                    similarity_match = re.search(r'📊 Similarity: ([\d.]+)%', lines[i])
+                if "📊 Similarity:" in block_line:
+                    similarity_match = _SIMILARITY_RE.search(block_line)
                     if similarity_match:
                         detection['similarity'] = float(similarity_match.group(1))
                 
                 # Extract time and duration
-                elif "⏰ Time:" in lines[i]:
-                    time_match = re.search(r'⏰ Time: (\d{2}:\d{2}:\d{2}).*?Duration: ([\d.]+)s', lines[i])
+                elif "⏰ Time:" in block_line:
+                    time_match = _MOTION_TIME_RE.search(block_line)
                     if time_match:
                         detection['timestamp'] = time_match.group(1)
                         detection['duration'] = float(time_match.group(2))
                 
-                i += 1
+                if not skip_checked and detection['similarity'] is not None and detection['timestamp'] is not None:
+                    skip_checked = True
+                    section_end = _section_end_line(log_text, resume, "📋 ===== CLAUDE RESPONSE ===== 📋", ("📊 Similarity:", "⏰ Time:"))
+                    if section_end is not None:
+                        rest = _lines_from(log_text, section_end)
+                
+                block_line, resume = next(rest, (None, resume))
             
             # Parse Claude response section - we're now at the CLAUDE RESPONSE line
-            while i < len(lines) and not "📋 ===========================" in lines[i]:
-                detection['raw_lines'].append(lines[i])
-                
+            skip_checked = False
+            while block_line is not None and not "📋 ===========================" in block_line:
                 # Extract detected action
-                if "🎭 Detected Action:" in lines[i]:
-                    action_match = re.search(r'🎭 Detected Action: ([^{"\s]+(?:\s+[^{"\s]+)*)', lines[i])
+                if "🎭 Detected Action:" in block_line:
+                    action_match = _DETECTED_ACTION_RE.search(block_line)
                     if action_match:
                         detection['action'] = action_match.group(1).strip()
                 
                 # Extract confidence
-                elif "🎯 Confidence:" in lines[i]:
-                    conf_match = re.search(r'🎯 Confidence: ([\d.]+)%', lines[i])
+                elif "🎯 Confidence:" in block_line:
+                    conf_match = _DETECTED_CONFIDENCE_RE.search(block_line)
                     if conf_match:
                         detection['confidence'] = float(conf_match.group(1))
                 
                 # Extract analysis duration
-                elif "⏱️  Analysis Duration:" in lines[i]:
-                    dur_match = re.search(r'⏱️  Analysis Duration: ([\d.]+)s', lines[i])
+                elif "⏱️  Analysis Duration:" in block_line:
+                    dur_match = _ANALYSIS_DURATION_RE.search(block_line)
                     if dur_match:
                         detection['analysis_duration'] = float(dur_match.group(1))
                 
-                i += 1
+                if (not skip_checked and detection['action'] is not None and
+                        detection['confidence'] is not None and detection['analysis_duration'] is not None):
+                    skip_checked = True
+                    section_end = _section_end_line(log_text, resume, "📋 ===========================",
+                                                    ("🎭 Detected Action:", "🎯 Confidence:", "⏱️  Analysis Duration:"))
+                    if section_end is not None:
+                        rest = _lines_from(log_text, section_end)
+                
+                block_line, resume = next(rest, (None, resume))
+            
+            # The block runs from the MOTION DETECTED line through the closing line (or the end of the log)
+            detection['raw_spans'].append((line_start, resume - 1))
             
             # Look for acceptance line after the closing line
-            if i < len(lines):
-                detection['raw_lines'].append(lines[i])  # Add the closing line
-                i += 1
-                
+            if block_line is not None:
                 # Check next few lines for acceptance/rejection
-                for j in range(i, min(i + 5, len(lines))):  # Increased range to check more lines
-                    if "✅ Action ACCEPTED:" in lines[j]:
-                        detection['accepted'] = True
-                        detection['raw_lines'].append(lines[j])
-                        break
-                    elif "❌ Action REJECTED:" in lines[j]:
-                        detection['accepted'] = False
-                        detection['raw_lines'].append(lines[j])
-                        break
-                    elif "❌ No action detected" in lines[j]:
-                        detection['accepted'] = False
-                        detection['raw_lines'].append(lines[j])
-                        break
+                verdict = _MOTION_VERDICT_RE.match(log_text, resume)
+                if verdict:
+                    verdict_start = log_text.rfind('\n', 0, verdict.start('verdict')) + 1
+                    verdict_end = log_text.find('\n', verdict.end('verdict'))
+                    if verdict_end == -1:
+                        verdict_end = len(log_text)
+                    detection['accepted'] = "✅ Action ACCEPTED:" in log_text[verdict_start:verdict_end]
+                    detection['raw_spans'].append((verdict_start, verdict_end))
+                
+                # The line right after the closing line is not scanned for a new detection
+                resume = next(rest, (None, resume))[1]
             
             # Only add detection if we found the essential components and it's not "(none)"
             if (detection['action'] and 
@@ -284,8 +350,6 @@ def extract_classifier_detections(log_text):
                 detection['action'].lower().strip() != "(none)"):
                 detection['raw_line'] = f"{detection['timestamp']} | {detection['action']} | {detection['confidence']}%"
                 detections.append(detection)
-        
-        i += 1
     
     return detections
 
@@ -293,21 +357,13 @@ def extract_food_detections(log_text):
     """Extract food detection events from logs."""
     food_detections = []
     
-    # Pattern for food detection
-    food_pattern = r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z).*Food detected and added to cache: (.+?) \(confidence: ([\d.]+)\)'
-    
-    matches = re.finditer(food_pattern, log_text)
+    matches = _FOOD_RE.finditer(log_text)
     for match in matches:
-        timestamp_str = match.group(1)
+        # The regex only matches "YYYY-MM-DDTHH:MM:SS.mmmZ", so the UTC clock time is a fixed slice
+        time_str = match.group(1)[11:19]
         food_type = match.group(2)
         confidence = float(match.group(3))
         
-        try:
-            timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            time_str = timestamp.strftime('%H:%M:%S')
-        except:
-            time_str = timestamp_str.split('T')[1][:8]
-        
         food_detections.append({
             'timestamp': time_str,
             'food_type': food_type,
@@ -328,22 +384,73 @@ def load_ground_truth(csv_file="../data/datasets/ml_dataset.csv"):
         print(f"❌ Error loading ground truth: {e}")
         return None
 
+# Common variations of logged action names -> ground truth labels
+_ACTION_MAP = {
+    'remove lid': 'remove-lid',
+    'add lid': 'add-lid', 
+    'remove food': 'remove-food',
+    'add food': 'add-food',
+    'flip': 'flip',
+    'remove pan': 'remove-pan',
+    'add pan': 'add-pan'
+}
+
+@lru_cache(maxsize=256)
 def normalize_action(action):
     """Normalize action names for comparison."""
     action = action.lower().strip()
-    
-    # Common variations
-    mappings = {
-        'remove lid': 'remove-lid',
-        'add lid': 'add-lid', 
-        'remove food': 'remove-food',
-        'add food': 'add-food',
-        'flip': 'flip',
-        'remove pan': 'remove-pan',
-        'add pan': 'add-pan'
+    return _ACTION_MAP.get(action, action.replace(' ', '-'))
+
+def detections_frame(detections):
+    """Lay detections out column-wise: one typed column per field instead of one dict per detection."""
+    def column(field):
+        # Missing or None values become NaN
+        return np.array([d.get(field) for d in detections], dtype=np.float64)
+    
+    # Normalize each distinct action name once rather than once per detection
+    raw_actions = pd.Categorical([d['action'] for d in detections])
+    
+    return pd.DataFrame({
+        'action': pd.Categorical(raw_actions.map(normalize_action)),
+        'accepted': np.fromiter((d['accepted'] for d in detections), dtype=bool, count=len(detections)),
+        'confidence': column('confidence'),
+        'threshold': column('threshold'),
+        'similarity': column('similarity'),
+        'analysis_duration': column('analysis_duration'),
+    })
+
+def _mean(values):
+    """Mean of a float array, summed left to right like sum(x) / len(x) so printed averages match older runs."""
+    return sum(values.tolist()) / values.size
+
+def summarize_detections(detections):
+    """Collect the counts and value arrays used by the reports from the columnar view of detections."""
+    df = detections_frame(detections)
+    accepted = df['accepted']
+    confidence = df['confidence']
+    threshold = df['threshold']
+    
+    # normalized action -> count, in order of first appearance
+    action_counts = df.groupby(['accepted', 'action'], sort=False, observed=True).size()
+    
+    def actions(flag):
+        if flag not in action_counts.index.get_level_values(0):
+            return Counter()
+        return Counter(action_counts.loc[flag].to_dict())
+    
+    return {
+        'accepted_count': int(accepted.sum()),
+        'rejected_count': int((~accepted).sum()),
+        'accepted_actions': actions(True),
+        'rejected_actions': actions(False),
+        'confidences': confidence.dropna().to_numpy(),
+        'accepted_confidences': confidence[accepted].dropna().to_numpy(),
+        'rejected_confidences': confidence[~accepted].dropna().to_numpy(),
+        'thresholds': threshold.dropna().tolist(),
+        'rejected_below_threshold': int((~accepted & (threshold != 0) & (confidence < threshold)).sum()),
+        'similarities': df['similarity'].dropna().to_numpy(),
+        'analysis_durations': df['analysis_duration'].dropna().to_numpy(),
     }
-    
-    return mappings.get(action, action.replace(' ', '-'))
 
 def analyze_performance(detections, ground_truth_df):
     """Analyze classifier performance against ground truth."""
@@ -366,29 +473,21 @@ def analyze_performance(detections, ground_truth_df):
     print(f"   Total detections: {len(detections)}")
     
     # Separate accepted vs rejected detections
-    accepted_detections = [d for d in detections if d.get('accepted', True)]  # Default to accepted if not specified
-    rejected_detections = [d for d in detections if not d.get('accepted', True)]
+    stats = summarize_detections(detections)
     
-    print(f"   Accepted detections: {len(accepted_detections)}")
-    print(f"   Rejected detections: {len(rejected_detections)}")
+    print(f"   Accepted detections: {stats['accepted_count']}")
+    print(f"   Rejected detections: {stats['rejected_count']}")
     
     # Count detections by action type (only accepted ones for main analysis)
-    detection_counts = Counter()
-    for det in accepted_detections:
-        normalized_action = normalize_action(det['action'])
-        detection_counts[normalized_action] += 1
+    detection_counts = stats['accepted_actions']
     
     print(f"\n📊 Accepted Detection Breakdown:")
     for action, count in detection_counts.items():
         print(f"   {action}: {count} detections")
     
-    if rejected_detections:
+    if stats['rejected_count']:
         print(f"\n❌ Rejected Detection Breakdown:")
-        rejected_counts = Counter()
-        for det in rejected_detections:
-            normalized_action = normalize_action(det['action'])
-            rejected_counts[normalized_action] += 1
-        for action, count in rejected_counts.items():
+        for action, count in stats['rejected_actions'].items():
             print(f"   {action}: {count} rejected")
     
     if ground_truth_df is not None:
@@ -424,33 +523,33 @@ def analyze_performance(detections, ground_truth_df):
     
     # Confidence analysis
     if detections:
-        confidences = [d['confidence'] for d in detections if d['confidence'] is not None]
-        if confidences:
-            avg_confidence = sum(confidences) / len(confidences)
-            min_confidence = min(confidences)
-            max_confidence = max(confidences)
+        confidences = stats['confidences']
+        if confidences.size:
+            avg_confidence = _mean(confidences)
+            min_confidence = confidences.min()
+            max_confidence = confidences.max()
             
             print(f"\n🎯 Confidence Analysis:")
             print(f"   Average confidence: {avg_confidence:.1f}%")
             print(f"   Range: {min_confidence:.1f}% - {max_confidence:.1f}%")
             
-            high_conf = len([c for c in confidences if c >= 80])
-            med_conf = len([c for c in confidences if 60 <= c < 80])
-            low_conf = len([c for c in confidences if c < 60])
+            high_conf = np.count_nonzero(confidences >= 80)
+            med_conf = np.count_nonzero((confidences >= 60) & (confidences < 80))
+            low_conf = np.count_nonzero(confidences < 60)
             
             print(f"   High confidence (≥80%): {high_conf}/{len(confidences)}")
             print(f"   Medium confidence (60-79%): {med_conf}/{len(confidences)}")
             print(f"   Low confidence (<60%): {low_conf}/{len(confidences)}")
             
             # Separate accepted vs rejected confidence analysis
-            accepted_confidences = [d['confidence'] for d in detections if d.get('accepted', True) and d['confidence'] is not None]
-            rejected_confidences = [d['confidence'] for d in detections if not d.get('accepted', True) and d['confidence'] is not None]
+            accepted_confidences = stats['accepted_confidences']
+            rejected_confidences = stats['rejected_confidences']
             
-            if accepted_confidences and rejected_confidences:
-                avg_accepted = sum(accepted_confidences) / len(accepted_confidences)
-                avg_rejected = sum(rejected_confidences) / len(rejected_confidences)
-                min_rejected = min(rejected_confidences) if rejected_confidences else 0
-                max_rejected = max(rejected_confidences) if rejected_confidences else 0
+            if accepted_confidences.size and rejected_confidences.size:
+                avg_accepted = _mean(accepted_confidences)
+                avg_rejected = _mean(rejected_confidences)
+                min_rejected = rejected_confidences.min()
+                max_rejected = rejected_confidences.max()
                 
                 print(f"\n📊 Acceptance vs Rejection Analysis:")
                 print(f"   Accepted avg confidence: {avg_accepted:.1f}%")
@@ -458,50 +557,52 @@ def analyze_performance(detections, ground_truth_df):
                 print(f"   Rejected confidence range: {min_rejected:.1f}% - {max_rejected:.1f}%")
                 
                 # Threshold analysis
-                thresholds = [d.get('threshold') for d in detections if d.get('threshold') is not None]
+                thresholds = stats['thresholds']
                 if thresholds:
                     unique_thresholds = list(set(thresholds))
                     print(f"   Thresholds used: {unique_thresholds}")
                     
                     # Analyze rejection reasons
-                    below_threshold = len([d for d in detections if not d.get('accepted', True) and d.get('threshold') and d['confidence'] < d['threshold']])
+                    below_threshold = stats['rejected_below_threshold']
                     print(f"   Rejections below threshold: {below_threshold}/{len(rejected_confidences)}")
     
     # Similarity analysis (new field)
-    similarities = [d['similarity'] for d in detections if d.get('similarity') is not None]
-    if similarities:
-        avg_similarity = sum(similarities) / len(similarities)
-        min_similarity = min(similarities)
-        max_similarity = max(similarities)
+    similarities = stats['similarities']
+    if similarities.size:
+        avg_similarity = _mean(similarities)
+        min_similarity = similarities.min()
+        max_similarity = similarities.max()
         
         print(f"\n📊 Motion Similarity Analysis:")
         print(f"   Average similarity: {avg_similarity:.1f}%")
         print(f"   Range: {min_similarity:.1f}% - {max_similarity:.1f}%")
     
     # Analysis duration stats (new field)
-    analysis_durations = [d['analysis_duration'] for d in detections if d.get('analysis_duration') is not None]
-    if analysis_durations:
-        avg_analysis_duration = sum(analysis_durations) / len(analysis_durations)
-        min_analysis_duration = min(analysis_durations)
-        max_analysis_duration = max(analysis_durations)
+    analysis_durations = stats['analysis_durations']
+    if analysis_durations.size:
+        avg_analysis_duration = _mean(analysis_durations)
+        min_analysis_duration = analysis_durations.min()
+        max_analysis_duration = analysis_durations.max()
         
         print(f"\n⚡ Analysis Performance:")
         print(f"   Average analysis time: {avg_analysis_duration:.1f}s")
         print(f"   Range: {min_analysis_duration:.1f}s - {max_analysis_duration:.1f}s")
         
-        slow_analyses = len([d for d in analysis_durations if d > 5.0])
+        slow_analyses = np.count_nonzero(analysis_durations > 5.0)
         if slow_analyses > 0:
             print(f"   Slow analyses (>5s): {slow_analyses}/{len(analysis_durations)}")
     
     # Detection timeline
     print(f"\n⏰ Detection Timeline:")
+    rows = []
     for i, det in enumerate(detections, 1):
         conf_str = f"{det['confidence']:5.1f}%" if det['confidence'] else "  N/A"
         dur_str = f"{det['duration']:4.1f}s" if det['duration'] else " N/A"
         sim_str = f"{det['similarity']:5.1f}%" if det.get('similarity') else "  N/A"
-        status_str = "✅" if det.get('accepted', True) else "❌"
+        status_str = "✅" if det['accepted'] else "❌"
         
-        print(f"   {i:2d}. {det['timestamp']} | {det['action']:15} | Conf:{conf_str} | Sim:{sim_str} | {dur_str} | {status_str}")
+        rows.append(f"   {i:2d}. {det['timestamp']} | {det['action']:15} | Conf:{conf_str} | Sim:{sim_str} | {dur_str} | {status_str}\n")
+    sys.stdout.write(''.join(rows))  # one write for the whole timeline
     
     return detection_counts, gt_counts
 
@@ -514,9 +615,11 @@ def provide_insights(detections, detection_counts, gt_counts):
         print("   • Check if classification is running and logging properly")
         return
     
+    stats = summarize_detections(detections)
+    
     # Acceptance rate analysis
-    accepted_count = len([d for d in detections if d.get('accepted', True)])
-    rejected_count = len([d for d in detections if not d.get('accepted', True)])
+    accepted_count = stats['accepted_count']
+    rejected_count = stats['rejected_count']
     total_count = len(detections)
     
     if rejected_count > 0:
@@ -529,19 +632,19 @@ def provide_insights(detections, detection_counts, gt_counts):
             print("   • Very high acceptance rate - consider lowering confidence threshold")
     
     # Confidence insights
-    confidences = [d['confidence'] for d in detections if d['confidence'] is not None]
-    if confidences:
-        avg_confidence = sum(confidences) / len(confidences)
+    confidences = stats['confidences']
+    if confidences.size:
+        avg_confidence = _mean(confidences)
         
         # Separate accepted vs rejected confidence stats
-        accepted_confidences = [d['confidence'] for d in detections if d.get('accepted', True) and d['confidence'] is not None]
-        rejected_confidences = [d['confidence'] for d in detections if not d.get('accepted', True) and d['confidence'] is not None]
+        accepted_confidences = stats['accepted_confidences']
+        rejected_confidences = stats['rejected_confidences']
         
         print(f"   • Average confidence: {avg_confidence:.1f}%")
         
-        if accepted_confidences and rejected_confidences:
-            avg_accepted = sum(accepted_confidences) / len(accepted_confidences)
-            avg_rejected = sum(rejected_confidences) / len(rejected_confidences)
+        if accepted_confidences.size and rejected_confidences.size:
+            avg_accepted = _mean(accepted_confidences)
+            avg_rejected = _mean(rejected_confidences)
             print(f"   • Accepted avg: {avg_accepted:.1f}%, Rejected avg: {avg_rejected:.1f}%")
             
             # Analyze confidence gap
@@ -560,31 +663,31 @@ def provide_insights(detections, detection_counts, gt_counts):
         else:
             print(f"   • Low confidence - model may need retraining")
         
-        low_conf_count = len([c for c in confidences if c < 70])
+        low_conf_count = np.count_nonzero(confidences < 70)
         if low_conf_count > 0:
             print(f"   • {low_conf_count} low-confidence detections may be false positives")
         
         # Rejection pattern analysis
-        if rejected_confidences:
-            max_rejected = max(rejected_confidences)
-            min_rejected = min(rejected_confidences)
+        if rejected_confidences.size:
+            max_rejected = rejected_confidences.max()
+            min_rejected = rejected_confidences.min()
             print(f"   • Rejection range: {min_rejected:.1f}% - {max_rejected:.1f}%")
             
             # Check if rejections are close to threshold
-            thresholds = [d.get('threshold') for d in detections if d.get('threshold') is not None]
+            thresholds = stats['thresholds']
             if thresholds:
                 avg_threshold = sum(thresholds) / len(thresholds)
-                close_to_threshold = len([c for c in rejected_confidences if abs(c - avg_threshold) < 5])
+                close_to_threshold = np.count_nonzero(np.abs(rejected_confidences - avg_threshold) < 5)
                 print(f"   • {close_to_threshold} rejections close to threshold (±5%)")
                 
                 if close_to_threshold > len(rejected_confidences) * 0.5:
                     print(f"   • Many rejections near threshold - consider fine-tuning")
     
     # Similarity insights
-    similarities = [d['similarity'] for d in detections if d.get('similarity') is not None]
-    if similarities:
-        avg_similarity = sum(similarities) / len(similarities)
-        low_sim_count = len([s for s in similarities if s < 75])
+    similarities = stats['similarities']
+    if similarities.size:
+        avg_similarity = _mean(similarities)
+        low_sim_count = np.count_nonzero(similarities < 75)
         
         print(f"   • Average motion similarity: {avg_similarity:.1f}%")
         if low_sim_count > 0:
@@ -594,10 +697,10 @@ def provide_insights(detections, detection_counts, gt_counts):
             print("   • Low motion similarity suggests noisy motion detection")
     
     # Analysis performance insights
-    analysis_durations = [d['analysis_duration'] for d in detections if d.get('analysis_duration') is not None]
-    if analysis_durations:
-        avg_analysis_time = sum(analysis_durations) / len(analysis_durations)
-        slow_count = len([d for d in analysis_durations if d > 5.0])
+    analysis_durations = stats['analysis_durations']
+    if analysis_durations.size:
+        avg_analysis_time = _mean(analysis_durations)
+        slow_count = np.count_nonzero(analysis_durations > 5.0)
         
         print(f"   • Average analysis time: {avg_analysis_time:.1f}s")
         if slow_count > 0:
@@ -607,11 +710,7 @@ def provide_insights(detections, detection_counts, gt_counts):
             print("   • Slow analysis times - consider optimizing model inference")
     
     # Action balance insights (only for accepted detections)
-    accepted_detection_counts = Counter()
-    for det in detections:
-        if det.get('accepted', True):
-            normalized_action = normalize_action(det['action'])
-            accepted_detection_counts[normalized_action] += 1
+    accepted_detection_counts = stats['accepted_actions']
     
     if 'remove-lid' in accepted_detection_counts and 'add-lid' in accepted_detection_counts:
         lid_ratio = accepted_detection_counts['add-lid'] / accepted_detection_counts['remove-lid']
@@ -632,14 +731,13 @@ def provide_insights(detections, detection_counts, gt_counts):
     print(f"\n📝 Recommendations:")
     
     # Confidence threshold recommendations
-    if confidences:
+    if confidences.size:
         if rejected_count > 0:
             # We have rejection data, so analyze the threshold effectiveness
-            rejected_confidences = [d['confidence'] for d in detections if not d.get('accepted', True) and d['confidence'] is not None]
-            if rejected_confidences:
-                max_rejected_conf = max(rejected_confidences)
-                min_rejected_conf = min(rejected_confidences)
-                avg_rejected_conf = sum(rejected_confidences) / len(rejected_confidences)
+            if rejected_confidences.size:
+                max_rejected_conf = rejected_confidences.max()
+                min_rejected_conf = rejected_confidences.min()
+                avg_rejected_conf = _mean(rejected_confidences)
                 
                 print(f"   • Current threshold analysis:")
                 print(f"     - Highest rejected: {max_rejected_conf:.1f}%")
@@ -647,9 +745,9 @@ def provide_insights(detections, detection_counts, gt_counts):
                 print(f"     - Lowest rejected: {min_rejected_conf:.1f}%")
                 
                 # Analyze threshold effectiveness
-                accepted_confidences = [d['confidence'] for d in detections if d.get('accepted', True) and d['confidence'] is not None]
-                if accepted_confidences:
-                    avg_accepted_conf = sum(accepted_confidences) / len(accepted_confidences)
+                accepted_confidences = stats['accepted_confidences']
+                if accepted_confidences.size:
+                    avg_accepted_conf = _mean(accepted_confidences)
                     threshold_gap = avg_accepted_conf - max_rejected_conf
                     
                     if threshold_gap > 15:
@@ -663,28 +761,28 @@ def provide_insights(detections, detection_counts, gt_counts):
                         suggested_threshold = max_rejected_conf + 5
                         print(f"     - Suggested threshold: {suggested_threshold:.1f}%")
             else:
-                avg_conf = sum(confidences) / len(confidences)
+                avg_conf = _mean(confidences)
                 if avg_conf >= 80:
                     print(f"   • Consider confidence threshold around 75-80% to filter noise")
                 else:
                     print(f"   • Consider confidence threshold around 65-70% to avoid missing actions")
         else:
             # No rejection data, use traditional analysis
-            avg_conf = sum(confidences) / len(confidences)
+            avg_conf = _mean(confidences)
             if avg_conf >= 80:
                 print(f"   • Set confidence threshold around 75-80% to filter noise")
             else:
                 print(f"   • Set confidence threshold around 65-70% to avoid missing actions")
     
     # Motion similarity recommendations
-    if similarities:
-        avg_sim = sum(similarities) / len(similarities)
+    if similarities.size:
+        avg_sim = _mean(similarities)
         if avg_sim < 85:
             print(f"   • Consider raising motion similarity threshold to reduce false triggers")
     
     # Performance recommendations
-    if analysis_durations:
-        avg_time = sum(analysis_durations) / len(analysis_durations)
+    if analysis_durations.size:
+        avg_time = _mean(analysis_durations)
         if avg_time > 3.0:
             print(f"   • Optimize model inference speed (current avg: {avg_time:.1f}s)")
     
@@ -693,7 +791,7 @@ def provide_insights(detections, detection_counts, gt_counts):
     
     if len(gt_counts) > 0:
         total_expected = sum(gt_counts.values)
-        total_detected = len([d for d in detections if d.get('accepted', True)])
+        total_detected = accepted_count
         if total_detected < total_expected * 0.7:
             print(f"   • Low detection rate - consider lowering confidence threshold")
         elif total_detected > total_expected * 1.3:
@@ -704,101 +802,103 @@ def provide_insights(detections, detection_counts, gt_counts):
 def export_classification_lines(log_text, detections, output_file="classification_timeline.log"):
     """Export just the classification result lines to a separate log file."""
     try:
-        with open(output_file, 'w') as f:
-            f.write("# Classifier Detection Timeline\n")
-            f.write("# Extracted classification results in chronological order\n")
-            f.write("# New Format: Motion Detection + Claude Analysis + Acceptance\n")
-            f.write("=" * 80 + "\n\n")
+        out = []
+        out.append("# Classifier Detection Timeline\n")
+        out.append("# Extracted classification results in chronological order\n")
+        out.append("# New Format: Motion Detection + Claude Analysis + Acceptance\n")
+        out.append("=" * 80 + "\n\n")
+        
+        # Write detection summary
+        out.append(f"Total detections found: {len(detections)}\n")
+        stats = summarize_detections(detections)
+        accepted_count = stats['accepted_count']
+        rejected_count = stats['rejected_count']
+        out.append(f"Accepted: {accepted_count}, Rejected: {rejected_count}\n\n")
+        
+        # Extract and write the structured log blocks
+        for i, detection in enumerate(detections, 1):
+            out.append(f"# Detection {i} - {detection['timestamp']} - {detection['action']}\n")
+            out.append(f"# Status: {'ACCEPTED' if detection['accepted'] else 'REJECTED'}\n")
             
-            # Write detection summary
-            f.write(f"Total detections found: {len(detections)}\n")
-            accepted_count = len([d for d in detections if d.get('accepted', True)])
-            rejected_count = len([d for d in detections if not d.get('accepted', True)])
-            f.write(f"Accepted: {accepted_count}, Rejected: {rejected_count}\n\n")
+            # Write all the raw lines for this detection
+            if 'raw_spans' in detection:
+                for start, end in detection['raw_spans']:
+                    out.append(log_text[start:end] + "\n")
+            else:
+                # Fallback to basic info if raw_spans not available
+                out.append(f"Time: {detection['timestamp']}\n")
+                out.append(f"Action: {detection['action']}\n")
+                out.append(f"Confidence: {detection['confidence']}%\n")
+                if detection.get('similarity'):
+                    out.append(f"Similarity: {detection['similarity']}%\n")
+                if detection.get('duration'):
+                    out.append(f"Duration: {detection['duration']}s\n")
+                if detection.get('analysis_duration'):
+                    out.append(f"Analysis Duration: {detection['analysis_duration']}s\n")
             
-            # Extract and write the structured log blocks
-            for i, detection in enumerate(detections, 1):
-                f.write(f"# Detection {i} - {detection['timestamp']} - {detection['action']}\n")
-                f.write(f"# Status: {'ACCEPTED' if detection.get('accepted', True) else 'REJECTED'}\n")
-                
-                # Write all the raw lines for this detection
-                if 'raw_lines' in detection:
-                    for line in detection['raw_lines']:
-                        f.write(line + "\n")
-                else:
-                    # Fallback to basic info if raw_lines not available
-                    f.write(f"Time: {detection['timestamp']}\n")
-                    f.write(f"Action: {detection['action']}\n")
-                    f.write(f"Confidence: {detection['confidence']}%\n")
-                    if detection.get('similarity'):
-                        f.write(f"Similarity: {detection['similarity']}%\n")
-                    if detection.get('duration'):
-                        f.write(f"Duration: {detection['duration']}s\n")
-                    if detection.get('analysis_duration'):
-                        f.write(f"Analysis Duration: {detection['analysis_duration']}s\n")
-                
-                f.write("\n" + "-" * 60 + "\n\n")
+            out.append("\n" + "-" * 60 + "\n\n")
+        
+        # Add comprehensive summary at the end
+        out.append("\n" + "=" * 80 + "\n")
+        out.append("# ANALYSIS SUMMARY\n")
+        out.append("=" * 80 + "\n")
+        
+        # Action breakdown
+        action_counts = {}
+        accepted_action_counts = {}
+        rejected_action_counts = {}
+        
+        for det in detections:
+            action = det['action']
+            if action not in action_counts:
+                action_counts[action] = 0
+            action_counts[action] += 1
             
-            # Add comprehensive summary at the end
-            f.write("\n" + "=" * 80 + "\n")
-            f.write("# ANALYSIS SUMMARY\n")
-            f.write("=" * 80 + "\n")
+            if det['accepted']:
+                if action not in accepted_action_counts:
+                    accepted_action_counts[action] = 0
+                accepted_action_counts[action] += 1
+            else:
+                if action not in rejected_action_counts:
+                    rejected_action_counts[action] = 0
+                rejected_action_counts[action] += 1
+        
+        out.append(f"\n# Detection Counts by Action:\n")
+        for action, count in sorted(action_counts.items()):
+            accepted = accepted_action_counts.get(action, 0)
+            rejected = rejected_action_counts.get(action, 0)
+            out.append(f"# {action}: {count} total (✅{accepted} accepted, ❌{rejected} rejected)\n")
+        
+        # Stats summary
+        if detections:
+            confidences = stats['confidences']
+            similarities = stats['similarities']
+            analysis_durations = stats['analysis_durations']
             
-            # Action breakdown
-            action_counts = {}
-            accepted_action_counts = {}
-            rejected_action_counts = {}
+            out.append(f"\n# Performance Statistics:\n")
+            out.append(f"# Total detections: {len(detections)}\n")
+            out.append(f"# Acceptance rate: {accepted_count}/{len(detections)} ({accepted_count/len(detections)*100:.1f}%)\n")
             
-            for det in detections:
-                action = det['action']
-                if action not in action_counts:
-                    action_counts[action] = 0
-                action_counts[action] += 1
-                
-                if det.get('accepted', True):
-                    if action not in accepted_action_counts:
-                        accepted_action_counts[action] = 0
-                    accepted_action_counts[action] += 1
-                else:
-                    if action not in rejected_action_counts:
-                        rejected_action_counts[action] = 0
-                    rejected_action_counts[action] += 1
+            if confidences.size:
+                out.append(f"# Average confidence: {_mean(confidences):.1f}%\n")
+                out.append(f"# Confidence range: {confidences.min():.1f}% - {confidences.max():.1f}%\n")
             
-            f.write(f"\n# Detection Counts by Action:\n")
-            for action, count in sorted(action_counts.items()):
-                accepted = accepted_action_counts.get(action, 0)
-                rejected = rejected_action_counts.get(action, 0)
-                f.write(f"# {action}: {count} total (✅{accepted} accepted, ❌{rejected} rejected)\n")
+            if similarities.size:
+                out.append(f"# Average similarity: {_mean(similarities):.1f}%\n")
+                out.append(f"# Similarity range: {similarities.min():.1f}% - {similarities.max():.1f}%\n")
             
-            # Stats summary
-            if detections:
-                confidences = [d['confidence'] for d in detections if d['confidence'] is not None]
-                similarities = [d['similarity'] for d in detections if d.get('similarity') is not None]
-                analysis_durations = [d['analysis_duration'] for d in detections if d.get('analysis_duration') is not None]
-                
-                f.write(f"\n# Performance Statistics:\n")
-                f.write(f"# Total detections: {len(detections)}\n")
-                f.write(f"# Acceptance rate: {accepted_count}/{len(detections)} ({accepted_count/len(detections)*100:.1f}%)\n")
-                
-                if confidences:
-                    avg_conf = sum(confidences) / len(confidences)
-                    f.write(f"# Average confidence: {avg_conf:.1f}%\n")
-                    f.write(f"# Confidence range: {min(confidences):.1f}% - {max(confidences):.1f}%\n")
-                
-                if similarities:
-                    avg_sim = sum(similarities) / len(similarities)
-                    f.write(f"# Average similarity: {avg_sim:.1f}%\n")
-                    f.write(f"# Similarity range: {min(similarities):.1f}% - {max(similarities):.1f}%\n")
-                
-                if analysis_durations:
-                    avg_analysis = sum(analysis_durations) / len(analysis_durations)
-                    f.write(f"# Average analysis time: {avg_analysis:.1f}s\n")
-                    f.write(f"# Analysis time range: {min(analysis_durations):.1f}s - {max(analysis_durations):.1f}s\n")
-                
-                # Timeline summary
-                f.write(f"\n# Timeline Summary:\n")
-                f.write(f"# First detection: {detections[0]['timestamp']} - {detections[0]['action']}\n")
-                f.write(f"# Last detection: {detections[-1]['timestamp']} - {detections[-1]['action']}\n")
+            if analysis_durations.size:
+                out.append(f"# Average analysis time: {_mean(analysis_durations):.1f}s\n")
+                out.append(f"# Analysis time range: {analysis_durations.min():.1f}s - {analysis_durations.max():.1f}s\n")
+            
+            # Timeline summary
+            out.append(f"\n# Timeline Summary:\n")
+            out.append(f"# First detection: {detections[0]['timestamp']} - {detections[0]['action']}\n")
+            out.append(f"# Last detection: {detections[-1]['timestamp']} - {detections[-1]['action']}\n")
+        
+        # One write for the whole timeline instead of one per line
+        with open(output_file, 'w') as f:
+            f.write(''.join(out))
         
         print(f"📝 Classification timeline exported to: {output_file}")
         return True
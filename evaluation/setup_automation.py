@@ -4,11 +4,74 @@ Setup script for the automated evaluation pipeline.
 Installs dependencies and validates configuration.
 """
 
+import argparse
 import subprocess
 import sys
 import json
 from pathlib import Path
 import os
+import shutil
+
+try:
+    import orjson
+except ImportError:  # optional; fall back to the stdlib parser
+    orjson = None
+
+# Files generated by setup, kept as constants so the text is built once
+_SAMPLE_VIDEOS_DIR = Path("../data/sample_videos")
+_SAMPLE_VIDEOS_README_PATH = _SAMPLE_VIDEOS_DIR / "README.md"
+_SAMPLE_VIDEOS_README = """# Sample Videos Directory
+
+Place your evaluation videos here. The automation script can process:
+- Individual videos: `--videos video1.mp4 video2.mp4`
+- All videos in directory: `--video-dir ../data/sample_videos`
+
+Supported formats: .mp4, .avi, .mov, .mkv
+
+Example video structure:
+```
+data/sample_videos/
+├── cooking_add_remove_food.mp4
+├── cooking_flip_actions.mp4
+├── cooking_lid_manipulation.mp4
+└── cooking_pan_operations.mp4
+```
+
+## Usage from evaluation directory:
+
+```bash
+cd evaluation/
+
+# Process all videos in this directory
+python3 automate_evaluation.py \\
+    --video-dir ../data/sample_videos \\
+    --output-dir ../data/results/evaluation_$(date +%Y%m%d_%H%M%S)
+```
+"""
+
+_EXAMPLE_SCRIPT_PATH = Path("run_evaluation_example.sh")
+_EXAMPLE_SCRIPT = """#!/bin/bash
+# Example usage of the automated evaluation pipeline
+
+echo "🎯 Starting Automated Evaluation Pipeline"
+
+# Option 1: Process specific videos
+python3 automate_evaluation.py \\
+    --videos ../data/sample_videos/video1.mp4 ../data/sample_videos/video2.mp4 \\
+    --config /Users/marcuslam/Desktop/Gambit/viam-marcus-dev-main.json \\
+    --output-dir ../data/results/evaluation_$(date +%Y%m%d_%H%M%S) \\
+    --timeout 15
+
+# Option 2: Process all videos in a directory
+# python3 automate_evaluation.py \\
+#     --video-dir ../data/sample_videos \\
+#     --config /Users/marcuslam/Desktop/Gambit/viam-marcus-dev-main.json \\
+#     --output-dir ../data/results/evaluation_$(date +%Y%m%d_%H%M%S) \\
+#     --timeout 15
+
+echo "✅ Evaluation complete!"
+echo "📊 Check results in ../data/results/ directory"
+"""
 
 def install_viam_sdk():
     """Install the Viam SDK if not already installed."""
@@ -38,8 +101,8 @@ def validate_config_file(config_path):
         return False
     
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        data = Path(config_path).read_bytes()
+        config = orjson.loads(data) if orjson is not None else json.loads(data)
         
         # Check for required cloud configuration
         cloud = config.get("cloud", {})
@@ -64,12 +127,23 @@ def validate_config_file(config_path):
         print(f"❌ Error reading config file: {e}")
         return False
 
-def check_viam_server():
-    """Check if viam-server is available."""
+def check_viam_server(verbose=False):
+    """Check if viam-server is available; with verbose, also run it to report its version."""
     print("🔍 Checking for viam-server...")
     
+    # A PATH lookup is enough to prove it exists; only spawn it when the version is wanted
+    server_path = shutil.which("viam-server")
+    if server_path is None:
+        print("❌ viam-server not found in PATH")
+        print("💡 Please install viam-server: https://docs.viam.com/installation/")
+        return False
+    
+    if not verbose:
+        print(f"✅ viam-server found: {server_path}")
+        return True
+    
     try:
-        result = subprocess.run(["viam-server", "--version"], 
+        result = subprocess.run([server_path, "--version"], 
                               capture_output=True, text=True, timeout=10)
         if result.returncode == 0:
             print("✅ viam-server found")
@@ -78,10 +152,6 @@ def check_viam_server():
         else:
             print("❌ viam-server command failed")
             return False
-    except FileNotFoundError:
-        print("❌ viam-server not found in PATH")
-        print("💡 Please install viam-server: https://docs.viam.com/installation/")
-        return False
     except subprocess.TimeoutExpired:
         print("❌ viam-server command timed out")
         return False
@@ -100,83 +170,36 @@ def check_analysis_script():
         print("❌ Analysis script not found: extract_and_align_classifier.py")
         return False
 
+def _write_setup_file(path, text, mode=None):
+    """Write one generated setup file, creating its directory and optionally setting its mode."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    if mode is not None:
+        os.chmod(path, mode)
+
 def create_sample_videos_dir():
     """Create a sample videos directory structure."""
     print("📁 Setting up sample directory structure...")
     
-    videos_dir = Path("../data/sample_videos")
-    videos_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Create a sample README
-    readme_path = videos_dir / "README.md"
-    with open(readme_path, 'w') as f:
-        f.write("""# Sample Videos Directory
-
-Place your evaluation videos here. The automation script can process:
-- Individual videos: `--videos video1.mp4 video2.mp4`
-- All videos in directory: `--video-dir ../data/sample_videos`
-
-Supported formats: .mp4, .avi, .mov, .mkv
-
-Example video structure:
-```
-data/sample_videos/
-├── cooking_add_remove_food.mp4
-├── cooking_flip_actions.mp4
-├── cooking_lid_manipulation.mp4
-└── cooking_pan_operations.mp4
-```
-
-## Usage from evaluation directory:
-
-```bash
-cd evaluation/
-
-# Process all videos in this directory
-python3 automate_evaluation.py \\
-    --video-dir ../data/sample_videos \\
-    --output-dir ../data/results/evaluation_$(date +%Y%m%d_%H%M%S)
-```
-""")
+    # Create the directory and a sample README
+    _write_setup_file(_SAMPLE_VIDEOS_README_PATH, _SAMPLE_VIDEOS_README)
     
-    print(f"✅ Created sample videos directory: {videos_dir}")
-    print(f"📝 See {readme_path} for usage instructions")
+    print(f"✅ Created sample videos directory: {_SAMPLE_VIDEOS_DIR}")
+    print(f"📝 See {_SAMPLE_VIDEOS_README_PATH} for usage instructions")
 
 def create_example_usage():
     """Create an example usage script."""
-    example_script = """#!/bin/bash
-# Example usage of the automated evaluation pipeline
-
-echo "🎯 Starting Automated Evaluation Pipeline"
-
-# Option 1: Process specific videos
-python3 automate_evaluation.py \\
-    --videos ../data/sample_videos/video1.mp4 ../data/sample_videos/video2.mp4 \\
-    --config /Users/marcuslam/Desktop/Gambit/viam-marcus-dev-main.json \\
-    --output-dir ../data/results/evaluation_$(date +%Y%m%d_%H%M%S) \\
-    --timeout 15
-
-# Option 2: Process all videos in a directory
-# python3 automate_evaluation.py \\
-#     --video-dir ../data/sample_videos \\
-#     --config /Users/marcuslam/Desktop/Gambit/viam-marcus-dev-main.json \\
-#     --output-dir ../data/results/evaluation_$(date +%Y%m%d_%H%M%S) \\
-#     --timeout 15
-
-echo "✅ Evaluation complete!"
-echo "📊 Check results in ../data/results/ directory"
-"""
+    _write_setup_file(_EXAMPLE_SCRIPT_PATH, _EXAMPLE_SCRIPT, 0o755)  # Make executable
     
-    script_path = Path("run_evaluation_example.sh")
-    with open(script_path, 'w') as f:
-        f.write(example_script)
-    
-    # Make executable
-    os.chmod(script_path, 0o755)
-    
-    print(f"✅ Created example usage script: {script_path}")
+    print(f"✅ Created example usage script: {_EXAMPLE_SCRIPT_PATH}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Set up the automated evaluation pipeline")
+    parser.add_argument('--verbose',
+                       action='store_true',
+                       help='Run viam-server --version to confirm the binary actually works')
+    args = parser.parse_args()
+    
     print("🚀 Setting up Automated Evaluation Pipeline")
     print("=" * 50)
     
@@ -188,7 +211,7 @@ def main():
         success = False
     
     print("\n2. Checking system requirements...")
-    if not check_viam_server():
+    if not check_viam_server(verbose=args.verbose):
         success = False
     
     print("\n3. Checking analysis script...")
@@ -10,14 +10,53 @@ Usage:
     python time_alignment_analyzer.py [detection_log] [ground_truth_csv] [video_start_time] [tolerance_seconds] [--no-stretch]
 """
 
-import pandas as pd
+import csv
+import os
 import re
 import sys
 from datetime import datetime, timedelta
 from collections import defaultdict
+from functools import lru_cache
+import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 
+# Detection header written by extract_and_align_classifier: "# Detection N - HH:MM:SS - <action>"
+_DETECTION_RE = re.compile(r'# Detection \d+ - (\d{2}:\d{2}:\d{2}) - ([^#\n]+)')
+
+def _hms_to_seconds(time_str):
+    """Seconds since midnight for a zero-padded "HH:MM:SS" string."""
+    hours, minutes, seconds = int(time_str[0:2]), int(time_str[3:5]), int(time_str[6:8])
+    if hours > 23 or minutes > 59 or seconds > 59:
+        raise ValueError(f"time data '{time_str}' is out of range")
+    return hours * 3600 + minutes * 60 + seconds
+
+def _csv_float(value):
+    """Float value of a CSV cell; empty cells become NaN as they did with pandas.read_csv."""
+    return float(value) if value.strip() else float('nan')
+
+# Common variations mapping
+_ACTION_MAP = {
+    'add food': 'add-food',
+    'remove food': 'remove-food',
+    'add pan': 'add-pan',
+    'remove pan': 'remove-pan',
+    'add lid': 'add-lid',
+    'remove lid': 'remove-lid',
+    'flip': 'flip',
+    'season': 'season',
+    'stir': 'stir'
+}
+
+@lru_cache(maxsize=256)
+def _normalize_action(action):
+    """Normalize action names for comparison."""
+    action = action.lower().strip()
+    return _ACTION_MAP.get(action, action.replace(' ', '-'))
+
+# Stretch factors / offsets this close to identity are treated as "no stretch needed"
+_STRETCH_EPSILON = 1e-6
+
 class TimeAlignmentAnalyzer:
     def __init__(self, tolerance_seconds=10.0, stretch_timeline=True):
         """
@@ -36,36 +75,29 @@ class TimeAlignmentAnalyzer:
         
     def load_detections_from_log(self, log_file):
         """Load detections from classification timeline log."""
-        with open(log_file, 'r') as f:
-            content = f.read()
-        
         # Extract detections using regex pattern for the timeline format
         # Only include ACCEPTED detections - skip REJECTED ones
-        pattern = r'# Detection \d+ - (\d{2}:\d{2}:\d{2}) - ([^#\n]+)'
-        matches = re.findall(pattern, content)
-        
         detections = []
-        lines = content.split('\n')
-        
-        # Find the status line for each detection to filter out rejected ones
-        for i, line in enumerate(lines):
-            if line.startswith('# Detection '):
-                # Extract detection info
-                match = re.search(r'# Detection \d+ - (\d{2}:\d{2}:\d{2}) - ([^#\n]+)', line)
-                if match:
-                    time_str = match.group(1)
-                    action = match.group(2).strip()
-                    
-                    # Check the next line for status
-                    if i + 1 < len(lines):
-                        status_line = lines[i + 1]
-                        if 'Status: ACCEPTED' in status_line:
-                            detections.append({
-                                'time_hms': time_str,
-                                'action': action,
-                                'time_seconds': None  # Will be calculated after setting video start time
-                            })
-                        # Skip REJECTED detections
+        pending = None  # detection whose status line comes next
+        
+        # Stream the file line by line; the status of each detection is on the line after its header
+        with open(log_file, 'r') as f:
+            for line in f:
+                if pending is not None:
+                    if 'Status: ACCEPTED' in line:
+                        detections.append(pending)
+                    # Skip REJECTED detections
+                    pending = None
+                
+                if line.startswith('# Detection '):
+                    # Extract detection info
+                    match = _DETECTION_RE.search(line)
+                    if match:
+                        pending = {
+                            'time_hms': match.group(1),
+                            'action': match.group(2).strip(),
+                            'time_seconds': None  # Will be calculated after setting video start time
+                        }
         
         self.detections = detections
         print(f"📊 Loaded {len(detections)} ACCEPTED detections from log (rejected detections filtered out)")
@@ -73,18 +105,23 @@ class TimeAlignmentAnalyzer:
     
     def load_ground_truth_from_csv(self, csv_file):
         """Load ground truth from ML dataset CSV."""
-        df = pd.read_csv(csv_file)
+        # The csv module is all this needs; importing pandas would dominate the script's startup
+        with open(csv_file, newline='', encoding='utf-8-sig') as f:  # tolerate a BOM like read_csv did
+            rows = list(csv.DictReader(f))
         
         ground_truth = []
-        for _, row in df.iterrows():
+        for row in rows:
+            start = _csv_float(row['start_time_seconds'])
+            end = _csv_float(row['end_time_seconds'])
             ground_truth.append({
-                'original_start': row['start_time_seconds'],
-                'original_end': row['end_time_seconds'],
-                'start_seconds': row['start_time_seconds'],  # Will be stretched later
-                'end_seconds': row['end_time_seconds'],      # Will be stretched later
+                'original_start': start,
+                'original_end': end,
+                'start_seconds': start,  # Will be stretched later
+                'end_seconds': end,      # Will be stretched later
+                'stretched_duration': end - start,
                 'action': row['action_label'],
                 'category': row['category_label'],
-                'duration': row['duration_seconds']
+                'duration': _csv_float(row['duration_seconds'])
             })
         
         self.ground_truth = ground_truth
@@ -101,12 +138,12 @@ class TimeAlignmentAnalyzer:
         try:
             self.video_start_time = datetime.strptime(start_time_str, "%H:%M:%S")
             print(f"📹 Video start time set to: {start_time_str}")
+            start_seconds = self.video_start_time.hour * 3600 + self.video_start_time.minute * 60 + self.video_start_time.second
             
             # Convert all detection times to seconds from video start
+            # (detection times always come from the zero-padded timeline header, so no strptime per detection)
             for detection in self.detections:
-                detection_time = datetime.strptime(detection['time_hms'], "%H:%M:%S")
-                time_diff = (detection_time - self.video_start_time).total_seconds()
-                detection['time_seconds'] = time_diff
+                detection['time_seconds'] = float(_hms_to_seconds(detection['time_hms']) - start_seconds)
                 
             print(f"✅ Converted {len(self.detections)} detection times to video seconds")
             
@@ -115,32 +152,17 @@ class TimeAlignmentAnalyzer:
     
     def normalize_action_name(self, action):
         """Normalize action names for comparison."""
-        action = action.lower().strip()
-        
-        # Common variations mapping
-        mappings = {
-            'add food': 'add-food',
-            'remove food': 'remove-food',
-            'add pan': 'add-pan',
-            'remove pan': 'remove-pan',
-            'add lid': 'add-lid',
-            'remove lid': 'remove-lid',
-            'flip': 'flip',
-            'season': 'season',
-            'stir': 'stir'
-        }
-        
-        return mappings.get(action, action.replace(' ', '-'))
+        return _normalize_action(action)
     
     def stretch_ground_truth_timeline(self):
-        """Stretch the ground truth timeline to match detection timeline span."""
+        """Stretch the ground truth timeline to match detection timeline span; return True if it was stretched."""
         if not self.detections or not self.ground_truth:
-            return
+            return False
         
         # Find the span of detections
         detection_times = [d['time_seconds'] for d in self.detections if d['time_seconds'] is not None]
         if not detection_times:
-            return
+            return False
             
         detection_start = min(detection_times)
         detection_end = max(detection_times)
@@ -162,6 +184,13 @@ class TimeAlignmentAnalyzer:
         print(f"   Original GT timeline: {gt_start:.1f}s to {gt_end:.1f}s (span: {gt_span:.1f}s)")
         print(f"   Stretch factor: {self.stretch_factor:.2f}x")
         
+        # Spans already line up: the stretch would map every GT time onto itself, and
+        # load_ground_truth_from_csv already set the unstretched values
+        if (abs(self.stretch_factor - 1.0) < _STRETCH_EPSILON
+                and abs(detection_start - gt_start) < _STRETCH_EPSILON):
+            print("🔧 Stretch ~= 1.0, skipping")
+            return False
+        
         # Apply stretching to ground truth
         for gt in self.ground_truth:
             # Stretch relative to GT start, then offset to align with detection start
@@ -173,6 +202,7 @@ class TimeAlignmentAnalyzer:
             gt['stretched_duration'] = stretched_end - stretched_start
         
         print(f"✅ Ground truth timeline stretched by {self.stretch_factor:.2f}x")
+        return True
 
     def find_temporal_matches(self):
         """
@@ -185,18 +215,27 @@ class TimeAlignmentAnalyzer:
             raise ValueError("Video start time must be set first using set_video_start_time()")
         
         # Apply timeline stretching if enabled
-        if self.stretch_timeline:
-            self.stretch_ground_truth_timeline()
+        stretched = self.stretch_timeline and self.stretch_ground_truth_timeline()
         
         matches = []
         false_positives = []
-        missed_ground_truth = []
         
         # Track which ground truth actions have been matched
-        matched_gt_indices = set()
+        matched_mask = np.zeros(len(self.ground_truth), dtype=bool)
+        
+        # Ground truth as arrays so each detection is compared against all of it at once
+        gt_start = np.array([gt['start_seconds'] for gt in self.ground_truth], dtype=float)
+        gt_end = np.array([gt['end_seconds'] for gt in self.ground_truth], dtype=float)
+        gt_center = (gt_start + gt_end) / 2
+        
+        # Distinct normalized GT actions, and each GT entry's index into that vocabulary
+        gt_vocab = {}
+        gt_codes = np.array([gt_vocab.setdefault(self.normalize_action_name(gt['action']), len(gt_vocab))
+                             for gt in self.ground_truth], dtype=np.intp)
+        action_masks = {}  # normalized detection action -> which GT entries it matches
         
         print(f"🔍 Using temporal tolerance: ±{self.tolerance:.1f} seconds")
-        if self.stretch_timeline:
+        if stretched:
             print(f"🔧 Applied timeline stretching: {self.stretch_factor:.2f}x")
         
         # For each detection, find closest ground truth match
@@ -204,54 +243,42 @@ class TimeAlignmentAnalyzer:
             detection_time = detection['time_seconds']
             detection_action = self.normalize_action_name(detection['action'])
             
-            best_match = None
-            best_time_diff = float('inf')
-            best_gt_index = None
+            # Check if actions match (or are similar)
+            actions_match = action_masks.get(detection_action)
+            if actions_match is None:
+                # String comparisons once per vocabulary entry, then spread to GT entries by code
+                compatible = np.array([detection_action == gt_action or 
+                                       detection_action in gt_action or 
+                                       gt_action in detection_action
+                                       for gt_action in gt_vocab], dtype=bool)
+                actions_match = compatible[gt_codes]
+                action_masks[detection_action] = actions_match
             
-            # Check all ground truth actions
-            for i, gt in enumerate(self.ground_truth):
-                if i in matched_gt_indices:
-                    continue  # Already matched
-                
-                gt_action = self.normalize_action_name(gt['action'])
-                
-                # Check if actions match (or are similar)
-                actions_match = (detection_action == gt_action or 
-                               detection_action in gt_action or 
-                               gt_action in detection_action)
-                
-                if actions_match:
-                    # Calculate time difference to stretched GT interval center
-                    gt_center = (gt['start_seconds'] + gt['end_seconds']) / 2
-                    time_diff = abs(detection_time - gt_center)
-                    
-                    # Check if detection falls within stretched GT interval or tolerance
-                    within_interval = gt['start_seconds'] <= detection_time <= gt['end_seconds']
-                    within_tolerance = within_interval or time_diff <= self.tolerance
-                    
-                    if within_tolerance:
-                        if time_diff < best_time_diff:
-                            best_match = gt
-                            best_time_diff = time_diff
-                            best_gt_index = i
+            # Time difference to each stretched GT interval center
+            time_diff = np.abs(detection_time - gt_center)
+            
+            # Detection must fall within the stretched GT interval or the tolerance
+            within_interval = (gt_start <= detection_time) & (detection_time <= gt_end)
+            candidates = actions_match & ~matched_mask & (within_interval | (time_diff <= self.tolerance))
             
-            if best_match:
+            if candidates.any():
+                # argmin picks the earliest GT entry on ties, like the strict < comparison did
+                best_gt_index = int(np.argmin(np.where(candidates, time_diff, np.inf)))
+                best_match = self.ground_truth[best_gt_index]
                 matches.append({
                     'detection': detection,
                     'ground_truth': best_match,
-                    'time_diff': best_time_diff,
+                    'time_diff': float(time_diff[best_gt_index]),
                     'within_stretched_interval': best_match['start_seconds'] <= detection_time <= best_match['end_seconds'],
                     'original_gt_center': (best_match['original_start'] + best_match['original_end']) / 2,
                     'stretched_gt_center': (best_match['start_seconds'] + best_match['end_seconds']) / 2
                 })
-                matched_gt_indices.add(best_gt_index)
+                matched_mask[best_gt_index] = True
             else:
                 false_positives.append(detection)
         
         # Find unmatched ground truth actions
-        for i, gt in enumerate(self.ground_truth):
-            if i not in matched_gt_indices:
-                missed_ground_truth.append(gt)
+        missed_ground_truth = [self.ground_truth[i] for i in np.flatnonzero(~matched_mask)]
         
         return {
             'matches': matches,
@@ -340,10 +367,11 @@ class TimeAlignmentAnalyzer:
         """Create a timeline visualization showing detections vs ground truth."""
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 10), sharex=True)
         
-        # Ground truth timeline
-        for i, gt in enumerate(self.ground_truth):
-            ax1.barh(gt['action'], gt['duration'], 
-                    left=gt['start_seconds'], 
+        # Ground truth timeline, drawn as one bar container rather than one barh call per action
+        if self.ground_truth:
+            ax1.barh([gt['action'] for gt in self.ground_truth],
+                    [gt['duration'] for gt in self.ground_truth],
+                    left=[gt['start_seconds'] for gt in self.ground_truth],
                     alpha=0.7, 
                     color='lightblue',
                     edgecolor='blue')
@@ -355,17 +383,19 @@ class TimeAlignmentAnalyzer:
         # Detection timeline with matches
         detection_y_pos = 0
         colors = {'match': 'green', 'false_positive': 'red'}
+        point_times, point_ys, point_colors = [], [], []
+        matched_ids = {id(m['detection']) for m in results['matches']}  # matches hold the same detection dicts
         
         for detection in self.detections:
             if detection['time_seconds'] is None:
                 continue
                 
             # Determine color based on match status
-            is_match = any(m['detection'] == detection for m in results['matches'])
-            color = colors['match'] if is_match else colors['false_positive']
+            is_match = id(detection) in matched_ids
+            point_times.append(detection['time_seconds'])
+            point_ys.append(detection_y_pos)
+            point_colors.append(colors['match'] if is_match else colors['false_positive'])
             
-            ax2.scatter(detection['time_seconds'], detection_y_pos, 
-                       c=color, s=100, alpha=0.8)
             ax2.annotate(f"{detection['action']}\n{detection['time_hms']}", 
                         (detection['time_seconds'], detection_y_pos),
                         xytext=(0, 10), textcoords='offset points',
@@ -373,6 +403,10 @@ class TimeAlignmentAnalyzer:
             
             detection_y_pos += 0.1
         
+        # All detection markers in a single scatter collection
+        if point_times:
+            ax2.scatter(point_times, point_ys, c=point_colors, s=100, alpha=0.8)
+        
         ax2.set_ylabel('Detections')
         ax2.set_xlabel('Time (seconds)')
         ax2.set_title('Detection Timeline (Green=Match, Red=False Positive)')
@@ -387,7 +421,11 @@ class TimeAlignmentAnalyzer:
         except Exception as e:
             print(f"⚠️  Could not save visualization: {e}")
         
-        plt.show()
+        # Only interactive backends can show the figure; headless runs just keep the saved PNG
+        if matplotlib.get_backend().lower() != 'agg':
+            plt.show()
+        else:
+            plt.close(fig)
 
 def main():
     """Main function with command line interface."""
@@ -416,6 +454,11 @@ def main():
     # Check for --no-stretch flag
     stretch_timeline = '--no-stretch' not in sys.argv
     
+    # Output piped or redirected (e.g. batch runs) means nobody is there to look at a plot window;
+    # render off-screen unless a backend was chosen explicitly with MPLBACKEND
+    if (not sys.stdout.isatty() or os.environ.get('RECORDSCRIPT_HEADLESS')) and 'MPLBACKEND' not in os.environ:
+        matplotlib.use('Agg')
+    
     # Initialize analyzer with custom tolerance and stretching option
     analyzer = TimeAlignmentAnalyzer(tolerance_seconds=tolerance_seconds, stretch_timeline=stretch_timeline)
     